@@ -0,0 +1,154 @@
+import asyncio
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from langchain_core.messages import HumanMessage
+from agents.llm_pool import pooled_llm
+
+
+class BatchBroker:
+    """Collects move prompts from concurrent games and sends them together.
+
+    Requests are held for at most `window` seconds (or until `max_batch`
+    are waiting), then dispatched either as one combined multi-position
+    prompt (mode="multi": one API request per batch) or through
+    llm.batch (mode="batch": one request each, sent concurrently).
+    Each caller gets back the raw answer text for its own prompt.
+    Requests whose caller gave up (timeout passed, future cancelled) are
+    dropped before their batch is sent.
+    """
+
+    def __init__(self, llm, window=0.05, max_batch=8, mode="multi", dispatchers=4):
+        if mode not in ("multi", "batch"):
+            raise ValueError(f"Unknown batching mode: {mode}")
+        self.llm = llm
+        self.window = window
+        self.max_batch = max_batch
+        self.mode = mode
+        self._queue = queue.Queue()
+        self._dispatch_pool = ThreadPoolExecutor(max_workers=dispatchers)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.dropped = 0
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._collect, name="hexamind-batch-broker", daemon=True)
+                self._thread.start()
+
+    def submit(self, prompt, timeout=None):
+        """Queue a prompt; past `timeout` seconds it is dropped unsent (TimeoutError)."""
+        now = time.monotonic()
+        future = Future()
+        self._queue.put((now, prompt, future, None if timeout is None else now + timeout))
+        self._ensure_running()
+        return future
+
+    def request(self, prompt, timeout=None):
+        return self.submit(prompt, timeout).result(timeout)
+
+    async def arequest(self, prompt, timeout=None):
+        # Cancelling the wrapper (wait_for timeout, task cancel) cancels the queued future too
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(prompt, timeout)), timeout)
+
+    def _collect(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = first[0] + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.requests += len(batch)
+            self._dispatch_pool.submit(self._dispatch, batch)
+
+    def _live(self, batch):
+        """Entries still worth sending; expired ones fail, cancelled ones are skipped."""
+        now = time.monotonic()
+        live = []
+        for entry in batch:
+            future, expires = entry[2], entry[3]
+            if expires is not None and now >= expires:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(TimeoutError("batched request expired before dispatch"))
+            elif future.set_running_or_notify_cancel():
+                live.append(entry)
+                continue
+            self.dropped += 1
+        return live
+
+    def _dispatch(self, batch):
+        batch = self._live(batch)
+        if not batch:
+            return
+        prompts = [entry[1] for entry in batch]
+        futures = [entry[2] for entry in batch]
+        try:
+            if self.mode == "batch" or len(batch) == 1:
+                responses = self.llm.batch([[HumanMessage(content=p)] for p in prompts], return_exceptions=True)
+                for future, response in zip(futures, responses):
+                    if isinstance(response, Exception):
+                        future.set_exception(response)
+                    else:
+                        future.set_result(response.content.strip())
+            else:
+                response = self.llm.invoke([HumanMessage(content=combine_prompts(prompts))])
+                answers = split_answers(response.content, len(prompts))
+                for future, answer in zip(futures, answers):
+                    future.set_result(answer)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "dropped": self.dropped,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+def combine_prompts(prompts):
+    parts = [
+        f"You will get {len(prompts)} independent positions.",
+        "Answer each one on its own line as <position>: <move number>, nothing else.",
+    ]
+    for i, prompt in enumerate(prompts, 1):
+        parts.append(f"### Position {i}\n{prompt.strip()}")
+    return "\n".join(parts)
+
+
+def split_answers(content, n):
+    """'1: 3\\n2: 0' -> ['3', '0']; positions missing from the reply come back as ''."""
+    answers = {}
+    for pos, ans in re.findall(r'(\d+)\s*[:=)\-]\s*(\d+)', content):
+        answers.setdefault(int(pos), ans)
+    return [answers.get(i, "") for i in range(1, n + 1)]
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker(model, window=0.05, max_batch=8, mode="multi"):
+    """Process-wide broker per model, so every game in this process batches together."""
+    with _brokers_lock:
+        broker = _brokers.get(model)
+        if broker is None:
+            # Multi-position replies are longer than a single move number
+            llm = pooled_llm(model, temperature=0.1, max_output_tokens=8 * max_batch)
+            broker = _brokers[model] = BatchBroker(llm, window=window, max_batch=max_batch, mode=mode)
+        return broker
@@ -0,0 +1,332 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from groq import RateLimitError
+from langchain_groq import ChatGroq
+
+# Lower number = served first
+PRIORITY_MOVE = 0
+PRIORITY_CRITIC = 1
+PRIORITY_COMMENTARY = 2
+
+# (requests per minute, tokens per minute) - Groq free tier for the 70B models
+DEFAULT_LIMITS = {
+    "groq": (30, 6000),
+}
+
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class RateLimitTimeout(TimeoutError):
+    """The limiter could not grant a request before the caller's timeout; nothing was sent."""
+
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = float(self.capacity)
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        # May go negative when actual usage exceeds the estimate; refill pays it back
+        self.level -= amount
+
+
+class RateLimiter:
+    """Request + token buckets shared by every caller of one (provider, model).
+
+    Waiting callers are served strictly by (priority, arrival), so player
+    moves overtake queued referee commentary. backoff() blocks everyone
+    until a server-provided Retry-After has passed.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._queue = []
+        self._seq = itertools.count()
+        self.granted = 0
+        self.throttled = 0
+
+    def _enqueue(self, priority):
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _try_grant(self, ticket, tokens):
+        """0 if granted, else seconds to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if self._queue[0] != ticket:
+                return 0.02
+            wait = max(self.blocked_until - now,
+                       self.requests.wait_time(1, now),
+                       self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.granted += 1
+            return 0.0
+
+    def _cancel(self, ticket):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def acquire(self, tokens=1, priority=PRIORITY_MOVE, timeout=None):
+        ticket = self._enqueue(priority)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        throttled = False
+        try:
+            while True:
+                wait = self._try_grant(ticket, tokens)
+                if wait == 0:
+                    return True
+                if not throttled:
+                    throttled = True
+                    self.throttled += 1
+                if deadline is not None and time.monotonic() + min(wait, 0.05) > deadline:
+                    self._cancel(ticket)
+                    return False
+                time.sleep(min(wait, 0.05))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    async def aacquire(self, tokens=1, priority=PRIORITY_MOVE, timeout=None):
+        ticket = self._enqueue(priority)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        throttled = False
+        try:
+            while True:
+                wait = self._try_grant(ticket, tokens)
+                if wait == 0:
+                    return True
+                if not throttled:
+                    throttled = True
+                    self.throttled += 1
+                if deadline is not None and time.monotonic() + min(wait, 0.05) > deadline:
+                    self._cancel(ticket)
+                    return False
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def record_usage(self, estimated, actual):
+        """Charge the difference once the real token count is known."""
+        if actual is None:
+            return
+        with self._lock:
+            self.tokens.take(actual - estimated)
+
+    def backoff(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def estimate_tokens(messages, max_output=16):
+    chars = sum(len(getattr(m, "content", m)) for m in messages)
+    return chars // 4 + max_output
+
+
+def retry_after(error):
+    """Seconds to wait if `error` is a rate-limit (HTTP 429) error, else None."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429 and not isinstance(error, RateLimitError):
+        return None
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 2.0
+
+
+class PooledLLM:
+    """Drop-in for a chat model: invoke/ainvoke/stream/astream go through the shared limiter.
+
+    Each takes an optional `timeout` (seconds) bounding the time spent queued
+    in the limiter; past it they raise RateLimitTimeout without calling the API.
+    """
+
+    def __init__(self, client, limiter, priority=PRIORITY_MOVE, max_output_tokens=16):
+        self.client = client
+        self.limiter = limiter
+        self.priority = priority
+        self.max_output_tokens = max_output_tokens
+
+    def _usage(self, response):
+        usage = getattr(response, "usage_metadata", None) or {}
+        return usage.get("total_tokens")
+
+    @staticmethod
+    def _until(timeout):
+        return time.monotonic() + timeout if timeout is not None else None
+
+    @staticmethod
+    def _left(until):
+        return None if until is None else max(0.0, until - time.monotonic())
+
+    def _acquire(self, estimate, until):
+        if not self.limiter.acquire(estimate, self.priority, timeout=self._left(until)):
+            raise RateLimitTimeout("rate limiter did not grant the request in time")
+
+    async def _aacquire(self, estimate, until):
+        if not await self.limiter.aacquire(estimate, self.priority, timeout=self._left(until)):
+            raise RateLimitTimeout("rate limiter did not grant the request in time")
+
+    def _backoff(self, error, attempt):
+        """After a failed attempt: True once every caller is backed off for a retry, False to re-raise."""
+        wait = retry_after(error)
+        if wait is None or attempt == MAX_RATE_LIMIT_RETRIES:
+            return False
+        self.limiter.backoff(wait * (attempt + 1))
+        return True
+
+    def _retrying(self, messages, timeout, call):
+        """call() under the limiter, retried after Retry-After backoffs on rate-limit errors."""
+        estimate = estimate_tokens(messages, self.max_output_tokens)
+        until = self._until(timeout)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self._acquire(estimate, until)
+            try:
+                return estimate, call()
+            except Exception as e:
+                if not self._backoff(e, attempt):
+                    raise
+
+    async def _aretrying(self, messages, timeout, call):
+        estimate = estimate_tokens(messages, self.max_output_tokens)
+        until = self._until(timeout)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self._aacquire(estimate, until)
+            try:
+                return estimate, await call()
+            except Exception as e:
+                if not self._backoff(e, attempt):
+                    raise
+
+    def invoke(self, messages, timeout=None, **kwargs):
+        estimate, response = self._retrying(messages, timeout, lambda: self.client.invoke(messages, **kwargs))
+        self.limiter.record_usage(estimate, self._usage(response))
+        return response
+
+    async def ainvoke(self, messages, timeout=None, **kwargs):
+        estimate, response = await self._aretrying(messages, timeout,
+                                                   lambda: self.client.ainvoke(messages, **kwargs))
+        self.limiter.record_usage(estimate, self._usage(response))
+        return response
+
+    def batch(self, inputs, return_exceptions=False, **kwargs):
+        """invoke() every message list concurrently; each call still goes through the limiter."""
+        def call(messages):
+            try:
+                return self.invoke(messages, **kwargs)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+        if len(inputs) <= 1:
+            return [call(m) for m in inputs]
+        with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+            return list(pool.map(call, inputs))
+
+    def stream(self, messages, timeout=None, **kwargs):
+        # Rate-limit retries only happen before the first chunk; closing the
+        # generator early cancels the underlying HTTP request.
+        def first():
+            chunks = iter(self.client.stream(messages, **kwargs))
+            return chunks, next(chunks, None)
+
+        _, (chunks, chunk) = self._retrying(messages, timeout, first)
+        try:
+            if chunk is not None:
+                yield chunk
+                yield from chunks
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    async def astream(self, messages, timeout=None, **kwargs):
+        async def first():
+            chunks = self.client.astream(messages, **kwargs).__aiter__()
+            try:
+                return chunks, await chunks.__anext__()
+            except StopAsyncIteration:
+                return chunks, None
+
+        _, (chunks, chunk) = await self._aretrying(messages, timeout, first)
+        try:
+            if chunk is not None:
+                yield chunk
+                async for chunk in chunks:
+                    yield chunk
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+
+
+# === Process-wide registry ===
+_lock = threading.Lock()
+_clients = {}
+_limiters = {}
+
+
+def get_limiter(provider, model):
+    key = (provider, model)
+    with _lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            rpm, tpm = DEFAULT_LIMITS.get(provider, DEFAULT_LIMITS["groq"])
+            limiter = _limiters[key] = RateLimiter(rpm, tpm)
+        return limiter
+
+
+def get_client(model, provider="groq", temperature=0.1):
+    """Shared chat client for (provider, model); temperature variants share its connection."""
+    if provider != "groq":
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    with _lock:
+        base = _clients.get((provider, model, None))
+        if base is None:
+            groq_key = os.getenv("GROQ_API_KEY")
+            if not groq_key:
+                raise ValueError("❌ GROQ_API_KEY not found in .env file! Get one free at https://console.groq.com/")
+            # Retries are driven by the pool's Retry-After backoff instead
+            base = _clients[(provider, model, None)] = ChatGroq(
+                model_name=model, groq_api_key=groq_key, temperature=temperature, max_retries=0
+            )
+        client = _clients.get((provider, model, temperature))
+        if client is None:
+            client = _clients[(provider, model, temperature)] = base.model_copy(update={"temperature": temperature})
+        return client
+
+
+def pooled_llm(model, provider="groq", temperature=0.1, priority=PRIORITY_MOVE, max_output_tokens=16):
+    return PooledLLM(get_client(model, provider, temperature), get_limiter(provider, model),
+                     priority=priority, max_output_tokens=max_output_tokens)
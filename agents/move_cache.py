@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hexamind", "moves.sqlite")
+
+
+class MoveCache:
+    """Two-tier cache of LLM move choices keyed by position.
+
+    Tier 1 is an in-process LRU; tier 2 an SQLite file (WAL mode) shared by
+    every process pointing at the same path. Entries expire after `ttl`
+    seconds and the disk tier is trimmed to `max_rows`, oldest first.
+    Cached answers are re-validated against the caller's valid_moves.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, capacity=4096, ttl=7 * 24 * 3600, max_rows=200000):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS moves ("
+                "key TEXT PRIMARY KEY, idx INTEGER, move TEXT, created REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS moves_created ON moves(created)")
+            self.db.commit()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._writes = 0
+
+    @staticmethod
+    def make_key(model, prompt_version, board_hash, player_id):
+        return f"{model}|v{prompt_version}|{board_hash:016x}|p{player_id}"
+
+    @staticmethod
+    def _encode(move):
+        (sq, sr), (eq, er) = move[0], move[1]
+        return f"{sq},{sr},{eq},{er}"
+
+    @staticmethod
+    def _decode(text):
+        sq, sr, eq, er = map(int, text.split(","))
+        return ((sq, sr), (eq, er))
+
+    def _validate(self, idx, move, valid_moves):
+        # Same position can list moves in a different order, so fall back to a lookup
+        if 0 <= idx < len(valid_moves) and tuple(valid_moves[idx]) == move:
+            return valid_moves[idx]
+        for candidate in valid_moves:
+            if tuple(candidate) == move:
+                return candidate
+        return None
+
+    def get(self, key, valid_moves):
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            tier = "memory"
+            if entry is not None and now - entry[2] > self.ttl:
+                del self.memory[key]
+                entry = None
+            if entry is None and self.db is not None:
+                row = self.db.execute(
+                    "SELECT idx, move, created FROM moves WHERE key = ? AND created >= ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], self._decode(row[1]), row[2])
+                    tier = "disk"
+            if entry is None:
+                self.misses += 1
+                return None
+
+            move = self._validate(entry[0], entry[1], valid_moves)
+            if move is None:
+                self.stale += 1
+                self.misses += 1
+                return None
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            self._trim_memory()
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+            return move
+
+    def put(self, key, idx, move):
+        move = (tuple(move[0]), tuple(move[1]))
+        now = time.time()
+        with self._lock:
+            self.memory[key] = (idx, move, now)
+            self.memory.move_to_end(key)
+            self._trim_memory()
+            if self.db is not None:
+                try:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO moves (key, idx, move, created) VALUES (?, ?, ?, ?)",
+                        (key, idx, self._encode(move), now),
+                    )
+                    self._writes += 1
+                    if self._writes % 256 == 0:
+                        self._evict_disk(now)
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Move cache write failed: {e}")
+
+    def _trim_memory(self):
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        self.db.execute("DELETE FROM moves WHERE created < ?", (now - self.ttl,))
+        self.db.execute(
+            "DELETE FROM moves WHERE key IN ("
+            "SELECT key FROM moves ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_move_cache():
+    """Process-wide cache at $HEXAMIND_MOVE_CACHE (empty string = memory only)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MoveCache(os.getenv("HEXAMIND_MOVE_CACHE", DEFAULT_PATH))
+        return _shared
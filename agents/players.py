@@ -1,12 +1,65 @@
+import asyncio
+import itertools
 import os
 import re
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage
+from agents.llm_pool import pooled_llm, estimate_tokens, PRIORITY_COMMENTARY, RateLimitTimeout
+from agents.move_cache import MoveCache, get_move_cache
+from agents.batching import get_broker
+from engine.logic import ChineseCheckers, CELLS, CELL_ID
+from engine.distance import score_moves
+from engine.book import board_key, get_book
+from engine.metrics import METRICS
+from engine.mcts import drop_tree, search_worker
+from engine.search import AlphaBeta
+from engine.transposition import TranspositionTable
 
 load_dotenv()
 
+# Runs LLM calls that have a deadline, so the caller can give up on them
+_LLM_THREADS = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hexamind-llm")
+
+def stream_until(llm, messages, done, timeout=None):
+    """Stream a reply, closing the request as soon as done(text) holds.
+
+    `timeout` bounds the wait for a rate-limiter slot (see PooledLLM).
+    Returns (text, time_to_first_token, time_to_decision) in seconds.
+    """
+    start = time.perf_counter()
+    ttft = None
+    text = ""
+    stream = llm.stream(messages, timeout=timeout)
+    try:
+        for chunk in stream:
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            text += chunk.content
+            if done(text):
+                break
+    finally:
+        stream.close()
+    return text, ttft, time.perf_counter() - start
+
+async def astream_until(llm, messages, done, timeout=None):
+    start = time.perf_counter()
+    ttft = None
+    text = ""
+    stream = llm.astream(messages, timeout=timeout)
+    try:
+        async for chunk in stream:
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            text += chunk.content
+            if done(text):
+                break
+    finally:
+        await stream.aclose()
+    return text, ttft, time.perf_counter() - start
+
 class HumanPlayer:
     def __init__(self, player_id):
         self.player_id = player_id
@@ -15,8 +68,14 @@ class HumanPlayer:
     def get_move(self, board_state, valid_moves): pass 
 
 class AIPlayer:
-    def __init__(self, player_id, model_provider="groq", display_name=None):
+    # Bump whenever build_prompt changes so cached answers from old prompts are ignored
+    PROMPT_VERSION = 2
+
+    def __init__(self, player_id, model_provider="groq", display_name=None, player_count=2,
+                 move_cache=None, top_k=8, max_per_piece=2, stream=False, batch=False,
+                 deadline=10.0, fallback_engine=None, book=None):
         self.player_id = player_id
+        self.player_count = player_count
         self.is_human = False
         self.provider = model_provider
         
@@ -27,11 +86,6 @@ class AIPlayer:
             self.name = f"P{player_id} [{model_provider.upper()}]"
         
         # ===== ALL MODELS USE GROQ BACKEND =====
-        groq_key = os.getenv("GROQ_API_KEY")
-        
-        if not groq_key:
-            raise ValueError("❌ GROQ_API_KEY not found in .env file! Get one free at https://console.groq.com/")
-        
         # Use different Groq models for variety (all free & fast)
         model_map = {
             "groq": "llama-3.3-70b-versatile",           # Llama 3.3 70B
@@ -41,79 +95,537 @@ class AIPlayer:
         
         groq_model = model_map.get(model_provider, "llama-3.3-70b-versatile")
         
-        self.llm = ChatGroq(
-            model_name=groq_model,
-            groq_api_key=groq_key,
-            temperature=0.1,
-            max_retries=2
-        )
+        # Shared client + rate limiter per model, so players don't race each other into 429s
+        self.model_name = groq_model
+        self.llm = pooled_llm(groq_model, temperature=0.1)
+        self.move_cache = move_cache if move_cache is not None else get_move_cache()
+        # Prompt pruning: only the top_k heuristic moves, at most max_per_piece per piece
+        self.top_k = top_k
+        self.max_per_piece = max_per_piece
+        self.token_stats = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self.last_usage = {}
+        # Streaming: stop reading as soon as a usable move number has arrived
+        self.stream = stream
+        # Batching: share requests with other games in this process via one broker
+        self.broker = get_broker(groq_model) if batch else None
+        # Decision deadline (seconds, None = wait for the LLM) and the local engine used past it
+        self.deadline = deadline
+        self.fallback_engine = fallback_engine or GreedyPlayer(player_id, player_count)
+        self.last_tier = None
+        self.last_decision_time = None
+        self.tier_counts = {}
+        # Opening book ($HEXAMIND_BOOK) answers known positions before cache or LLM
+        self.book = book if book is not None else get_book()
         
         print(f"✅ {self.name} → Groq Backend ({groq_model})")
 
+    def select_candidates(self, valid_moves):
+        """Indices of the top_k moves by goal-distance gain, spread across pieces."""
+        gains = score_moves(valid_moves, self.player_id, self.player_count)
+        order = sorted(range(len(valid_moves)), key=lambda i: -gains[i])
+        picked, per_piece = [], {}
+        for i in order:
+            start = valid_moves[i][0]
+            if per_piece.get(start, 0) < self.max_per_piece:
+                per_piece[start] = per_piece.get(start, 0) + 1
+                picked.append(i)
+                if len(picked) == self.top_k:
+                    break
+        # Not enough distinct pieces: top up with the best of the rest
+        for i in order:
+            if len(picked) >= self.top_k:
+                break
+            if i not in picked:
+                picked.append(i)
+        return picked, gains
+
+    def build_prompt(self, valid_moves, candidates, gains):
+        # Compact encoding: start>end as board cell ids, +N = hex steps gained toward the goal
+        options = " ".join(
+            f"{n}:{CELL_ID[valid_moves[i][0]]}>{CELL_ID[valid_moves[i][1]]}{int(gains[i]):+d}"
+            for n, i in enumerate(candidates)
+        )
+        return f"""Chinese Checkers, Player {self.player_id}.
+Moves are start>end cell ids; +N = steps gained toward your goal triangle.
+{options}
+Pick the best move. Reply with ONLY its number."""
+
+    def parse_index(self, content, n):
+        # Extract first number from response
+        match = re.search(r'\d+', content)
+        if match:
+            idx = int(match.group())
+            if 0 <= idx < n: 
+                return idx
+        return None
+
+    def index_ready(self, text, n):
+        """True once a partial response pins down the move number (or can't)."""
+        match = re.search(r'\d+', text)
+        if not match:
+            return False
+        # The number is complete if something follows it, or appending a digit
+        # could only produce an out-of-range index
+        return match.end() < len(text) or int(match.group()) * 10 >= n
+
+    def cache_key(self, board_state):
+        game = ChineseCheckers(self.player_count)
+        game.board = board_state
+        game.to_move = self.player_id
+        return MoveCache.make_key(self.model_name, self.PROMPT_VERSION, game.compute_hash(), self.player_id)
+
+    def _record_usage(self, prompt, response):
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or estimate_tokens([prompt], 0)
+        self.token_stats["calls"] += 1
+        self.token_stats["prompt_tokens"] += prompt_tokens
+        self.token_stats["completion_tokens"] += usage.get("output_tokens", 0)
+        METRICS.inc("hexamind_llm_tokens_total", prompt_tokens, model=self.model_name, kind="prompt")
+        METRICS.inc("hexamind_llm_tokens_total", usage.get("output_tokens", 0), model=self.model_name, kind="completion")
+        self.last_usage = {"prompt_tokens": prompt_tokens, "output_tokens": usage.get("output_tokens"),
+                           "prompt_chars": len(prompt)}
+
+    def _record_stream(self, prompt, text, ttft, decision_time):
+        self._record_usage(prompt, None)
+        self.last_usage.update({"output_chars": len(text), "ttft": ttft, "decision_time": decision_time})
+
+    def _finish(self, key, content, valid_moves, candidates):
+        n = self.parse_index(content, len(candidates))
+        if n is None:
+            print(f"⚠️ Could not parse AI response: {content}")
+            return None
+        idx = candidates[n]
+        self.move_cache.put(key, idx, valid_moves[idx])
+        return valid_moves[idx]
+
+    def _llm_mode(self):
+        return "broker" if self.broker is not None else "stream" if self.stream else "invoke"
+
+    def _ask(self, prompt, n, ready=None, timeout=None, batched=True):
+        """One LLM round trip for a prompt offering n moves; returns the reply text.
+
+        `ready(text)` ends a streamed reply early (default: index_ready).
+        `timeout` is the time left before the decision deadline; a request
+        the rate limiter (or the broker) cannot send by then is dropped unsent.
+        batched=False bypasses the broker, whose combined prompt carries only
+        one move number per position.
+        """
+        ready = ready or (lambda t: self.index_ready(t, n))
+        if batched and self.broker is not None:
+            text = self.broker.request(prompt, timeout)
+            self._record_usage(prompt, None)
+            return text
+        if self.stream:
+            text, ttft, elapsed = stream_until(self.llm, [HumanMessage(content=prompt)], ready, timeout)
+            self._record_stream(prompt, text, ttft, elapsed)
+            return text.strip()
+        response = self.llm.invoke([HumanMessage(content=prompt)], timeout=timeout)
+        self._record_usage(prompt, response)
+        return response.content.strip()
+
+    async def _aask(self, prompt, n, timeout=None):
+        if self.broker is not None:
+            text = await self.broker.arequest(prompt, timeout)
+            self._record_usage(prompt, None)
+            return text
+        if self.stream:
+            text, ttft, elapsed = await astream_until(
+                self.llm, [HumanMessage(content=prompt)], lambda t: self.index_ready(t, n), timeout)
+            self._record_stream(prompt, text, ttft, elapsed)
+            return text.strip()
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)], timeout=timeout)
+        self._record_usage(prompt, response)
+        return response.content.strip()
+
+    def _llm_failed(self, e):
+        if isinstance(e, RateLimitTimeout):
+            # Rate limit full until past the deadline: nothing was sent
+            METRICS.inc("hexamind_llm_skipped_total", model=self.model_name)
+            print(f"⏱️ {self.name}: no rate-limit slot before the deadline, skipping the LLM")
+            return
+        METRICS.inc("hexamind_llm_errors_total", model=self.model_name)
+        print(f"❌ AI Error for {self.name}: {e}")
+
+    def _llm_timed(self, start):
+        METRICS.observe("hexamind_llm_seconds", time.perf_counter() - start,
+                        model=self.model_name, mode=self._llm_mode())
+
+    def _llm_choose(self, key, valid_moves, timeout=None):
+        """Ask the LLM; returns a valid move or None on error / unparseable reply."""
+        candidates, gains = self.select_candidates(valid_moves)
+        prompt = self.build_prompt(valid_moves, candidates, gains)
+        start = time.perf_counter()
+        try:
+            text = self._ask(prompt, len(candidates), timeout=timeout)
+        except Exception as e:
+            self._llm_failed(e)
+            return None
+        finally:
+            self._llm_timed(start)
+        return self._finish(key, text, valid_moves, candidates)
+
+    async def _allm_choose(self, key, valid_moves, timeout=None):
+        candidates, gains = self.select_candidates(valid_moves)
+        prompt = self.build_prompt(valid_moves, candidates, gains)
+        start = time.perf_counter()
+        try:
+            text = await self._aask(prompt, len(candidates), timeout)
+        except Exception as e:
+            self._llm_failed(e)
+            return None
+        finally:
+            self._llm_timed(start)
+        return self._finish(key, text, valid_moves, candidates)
+
+    def build_ranking_prompt(self, valid_moves, candidates, gains, k, feedback=""):
+        prompt = self.build_prompt(valid_moves, candidates, gains)
+        prompt = prompt.rsplit("\n", 1)[0]
+        if feedback:
+            prompt += f"\nRejected last time: {feedback}"
+        return prompt + f"\nRank your best {k} moves. Reply with ONLY their numbers, best first, comma separated."
+
+    def parse_ranking(self, content, n, k):
+        ranked = []
+        for match in re.findall(r'\d+', content):
+            idx = int(match)
+            if 0 <= idx < n and idx not in ranked:
+                ranked.append(idx)
+                if len(ranked) == k:
+                    break
+        return ranked
+
+    def ranking_ready(self, text, n, k):
+        """True once a partial response holds k complete move numbers."""
+        # A trailing number may still be growing digits
+        return len(self.parse_ranking(text.rstrip("0123456789"), n, k)) == k
+
+    def _llm_rank(self, moves, k, feedback="", timeout=None):
+        """Ask the LLM to rank its best k of `moves`; best first, [] on error."""
+        candidates, gains = self.select_candidates(moves)
+        prompt = self.build_ranking_prompt(moves, candidates, gains, k, feedback)
+        n = len(candidates)
+        start = time.perf_counter()
+        try:
+            # k answers per position: sent on its own, never through the broker
+            text = self._ask(prompt, n, lambda t: self.ranking_ready(t, n, k), timeout, batched=False)
+        except Exception as e:
+            self._llm_failed(e)
+            return []
+        finally:
+            METRICS.observe("hexamind_llm_seconds", time.perf_counter() - start,
+                            model=self.model_name, mode="rank")
+        return [moves[candidates[i]] for i in self.parse_ranking(text, n, k)]
+
+    def propose_moves(self, board_state, valid_moves, k=3, feedback="", exclude=()):
+        """Up to k moves, best first, via the same book -> cache -> llm -> engine chain as get_move.
+
+        Only the LLM tier ranks several moves; the others propose their one
+        choice. `exclude` drops moves a critic already rejected.
+        """
+        start = time.perf_counter()
+        moves = [m for m in valid_moves if m not in exclude] or valid_moves
+        move = self._book_move(board_state, moves)
+        if move is not None:
+            return [self._decided("book", move, start)]
+        cached = self.move_cache.get(self.cache_key(board_state), moves)
+        if cached is not None:
+            return [self._decided("cache", cached, start)]
+
+        ranked = self._before_deadline(start, self._llm_rank, moves, k, feedback)
+        if ranked:
+            return [self._decided("llm", ranked[0], start)] + ranked[1:]
+        return [self._fallback(board_state, moves, start)]
+
+    # === Fallback chain: book -> cache -> llm -> engine -> random ===
+    def _book_move(self, board_state, valid_moves):
+        if not self.book:
+            return None
+        key = board_key(board_state, self.player_count, self.player_id)
+        return self.book.choose(key, valid_moves, self.player_count)
+
+    def _decided(self, tier, move, start):
+        self.last_tier = tier
+        self.tier_counts[tier] = self.tier_counts.get(tier, 0) + 1
+        self.last_decision_time = time.perf_counter() - start
+        METRICS.inc("hexamind_move_tier_total", tier=tier)
+        METRICS.observe("hexamind_decision_seconds", self.last_decision_time, tier=tier)
+        return move
+
+    def _fallback(self, board_state, valid_moves, start):
+        try:
+            move = self.fallback_engine.get_move(board_state, valid_moves)
+            if move in valid_moves:
+                return self._decided("engine", move, start)
+        except Exception as e:
+            print(f"❌ Fallback engine error for {self.name}: {e}")
+        return self._decided("random", random.choice(valid_moves), start)
+
+    def _remaining(self, start):
+        return max(0.0, self.deadline - (time.perf_counter() - start))
+
+    def _before_deadline(self, start, fn, *args):
+        """fn(*args, timeout=time left), or None once the decision deadline has passed."""
+        if self.deadline is None:
+            return fn(*args)
+        # Time left is measured when a worker picks the call up, not at submit
+        future = _LLM_THREADS.submit(lambda: fn(*args, timeout=self._remaining(start)))
+        try:
+            return future.result(timeout=self._remaining(start))
+        except FutureTimeout:
+            print(f"⏱️ {self.name} missed its {self.deadline:.1f}s deadline, using local engine")
+            return None
+
     def get_move(self, board_state, valid_moves):
-        # Target Logic - where each player needs to go
-        target = (0, 0)
-        if self.player_id == 1: 
-            target = (0, 4)
-        elif self.player_id == 2: 
-            target = (-4, 0)
-        elif self.player_id == 3: 
-            target = (4, -4)
-
-        target_desc = f"Target (q={target[0]}, r={target[1]})"
-        move_options = ""
-        for i, move in enumerate(valid_moves):
-            move_options += f"{i}:{move}|" 
-
-        prompt = f"""
-You are playing Chinese Checkers as Player {self.player_id}.
-
-GOAL: Move your pieces to {target_desc}
-
-AVAILABLE MOVES:
-{move_options}
-
-Choose the move that gets you CLOSEST to your goal.
-Respond with ONLY the integer ID of your chosen move (e.g., "5").
-"""
-        
+        start = time.perf_counter()
+        move = self._book_move(board_state, valid_moves)
+        if move is not None:
+            return self._decided("book", move, start)
+        key = self.cache_key(board_state)
+        cached = self.move_cache.get(key, valid_moves)
+        if cached is not None:
+            return self._decided("cache", cached, start)
+
+        # A late answer still lands in the move cache when it arrives
+        move = self._before_deadline(start, self._llm_choose, key, valid_moves)
+        if move is not None:
+            return self._decided("llm", move, start)
+        return self._fallback(board_state, valid_moves, start)
+
+    def speculate(self, board_state, valid_moves):
+        """Start the LLM request for a position before its turn comes up.
+
+        Only the request runs early: book, cache and tier bookkeeping wait for
+        aget_move(..., speculative=task) on the real position. The caller
+        hands the task over only if that turn's valid moves (and so the
+        prompt) are unchanged, and cancels it otherwise.
+        """
+        key = self.cache_key(board_state)
+        return asyncio.ensure_future(self._allm_choose(key, valid_moves, self.deadline))
+
+    async def aget_move(self, board_state, valid_moves, speculative=None):
+        start = time.perf_counter()
+        move, tier = self._book_move(board_state, valid_moves), "book"
+        if move is None:
+            key = self.cache_key(board_state)
+            move, tier = self.move_cache.get(key, valid_moves), "cache"
+        if move is not None:
+            if speculative is not None:
+                speculative.cancel()
+            return self._decided(tier, move, start)
+
+        task = speculative
+        if task is None:
+            timeout = None if self.deadline is None else self._remaining(start)
+            task = asyncio.ensure_future(self._allm_choose(key, valid_moves, timeout))
+        if self.deadline is None:
+            move = await task
+        else:
+            try:
+                move = await asyncio.wait_for(asyncio.shield(task), timeout=self._remaining(start))
+            except asyncio.TimeoutError:
+                print(f"⏱️ {self.name} missed its {self.deadline:.1f}s deadline, using local engine")
+                move = None
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+        if move is not None:
+            return self._decided("llm", move, start)
+        return self._fallback(board_state, valid_moves, start)
+
+class RandomPlayer:
+    def __init__(self, player_id, seed=None):
+        self.player_id = player_id
+        self.name = f"P{player_id} [RANDOM]"
+        self.is_human = False
+        self._rng = random.Random(seed)
+
+    def get_move(self, board_state, valid_moves):
+        return self._rng.choice(valid_moves)
+
+class GreedyPlayer:
+    """Picks the move with the largest goal-distance gain (random tie-break)."""
+
+    def __init__(self, player_id, player_count=2, seed=None):
+        self.player_id = player_id
+        self.player_count = player_count
+        self.name = f"P{player_id} [GREEDY]"
+        self.is_human = False
+        self._rng = random.Random(seed)
+
+    def get_move(self, board_state, valid_moves):
+        gains = score_moves(valid_moves, self.player_id, self.player_count)
+        best = [i for i, g in enumerate(gains) if g == gains.max()]
+        return valid_moves[self._rng.choice(best)]
+
+class SearchPlayer:
+    """Front end shared by the local search agents.
+
+    get_move / propose_moves answer from the opening book when it knows the
+    position, else rank valid_moves with the subclass's
+    _search_ranked(game, valid_moves) on a game set up for this player.
+    """
+
+    def get_move(self, board_state, valid_moves):
+        return self._ranked_moves(board_state, valid_moves)[0]
+
+    def propose_moves(self, board_state, valid_moves, k=3, feedback="", exclude=()):
+        """Top-k moves from one search, best first; `exclude` drops moves a critic rejected."""
+        moves = [m for m in valid_moves if m not in exclude] or valid_moves
+        return self._ranked_moves(board_state, moves)[:k]
+
+    def _ranked_moves(self, board_state, valid_moves):
+        """Book move, else the search's ranking of valid_moves (never empty)."""
+        game = ChineseCheckers(self.player_count)
+        game.board = board_state
+        game.to_move = self.player_id
+        game.hash = game.compute_hash()
+
+        move = self.book.choose(game.hash, valid_moves, self.player_count) if self.book else None
+        self.last_tier = "book" if move is not None else None
+        if move is not None:
+            return [move]
+        return self._search_ranked(game, valid_moves) or [random.choice(valid_moves)]
+
+    def _search_ranked(self, game, valid_moves):
+        raise NotImplementedError
+
+class MCTSPlayer(SearchPlayer):
+    """Local root-parallel MCTS agent; same get_move interface as AIPlayer."""
+
+    _trees = itertools.count()
+
+    def __init__(self, player_id, player_count=2, time_limit=1.0, playouts=None,
+                 workers=None, exploration=1.0, display_name=None, seed=None, book=None):
+        if playouts is None and not time_limit:
+            raise ValueError("MCTSPlayer needs a time_limit or a playouts budget")
+        self.player_id = player_id
+        self.player_count = player_count
+        self.is_human = False
+        self.name = f"P{player_id} [{display_name or 'MCTS'}]"
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.exploration = exploration
+        self.last_stats = {}
+        self._pool = None
+        self._rng = random.Random(seed)
+        # Key of this player's reusable search tree in whichever process runs the search
+        self._tree = f"{os.getpid()}-{next(self._trees)}"
+        self.book = book if book is not None else get_book()
+        self.last_tier = None
+
+    def _search(self, game):
+        args = (bytes(game.cells), self.player_count, self.player_id,
+                self.playouts, self.time_limit)
+        seeds = [self._rng.getrandbits(32) for _ in range(max(self.workers, 1))]
+        if self.workers <= 1:
+            return [search_worker(*args, seeds[0], self.exploration, self._tree)]
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            
-            # Extract first number from response
-            match = re.search(r'\d+', content)
-            if match:
-                idx = int(match.group())
-                if 0 <= idx < len(valid_moves): 
-                    return valid_moves[idx]
-            
-            # Fallback to random if parsing fails
-            print(f"⚠️ Could not parse AI response: {content}")
-            return random.choice(valid_moves)
-            
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [self._pool.submit(search_worker, *args, seed, self.exploration, self._tree)
+                       for seed in seeds]
+            return [f.result() for f in futures]
         except Exception as e:
-            print(f"❌ AI Error for {self.name}: {e}")
-            return random.choice(valid_moves)
+            print(f"⚠️ {self.name} process pool failed, searching in-process: {e}")
+            self.close()
+            return [search_worker(*args, seeds[0], self.exploration, self._tree)]
+
+    def _search_ranked(self, game, valid_moves):
+        """valid_moves searched at the root, by visits then value."""
+        results = self._search(game)
+
+        # Merge root statistics across workers
+        visits, value, playouts = {}, {}, 0
+        for n, stats in results:
+            playouts += n
+            for move, (v, w) in stats.items():
+                visits[move] = visits.get(move, 0) + v
+                value[move] = value.get(move, 0.0) + w
+
+        valid = set(valid_moves)
+        ranked = []
+        for s, e in sorted(visits, key=lambda m: (visits[m], value[m]), reverse=True):
+            move = (CELLS[s], CELLS[e])
+            if move in valid:
+                ranked.append(move)
+
+        self.last_stats = {"playouts": playouts, "workers": len(results), "root_moves": len(visits)}
+        return ranked
+
+    def close(self):
+        # Pool workers take their trees with them; the in-process one is dropped here
+        drop_tree(self._tree)
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+class AlphaBetaPlayer(SearchPlayer):
+    """Deterministic negamax alpha-beta agent for 2-player duels."""
+
+    def __init__(self, player_id, player_count=2, time_limit=0.5, max_depth=32, display_name=None,
+                 verbose=True, book=None):
+        if player_count != 2:
+            raise ValueError("AlphaBetaPlayer only supports 2-player duels")
+        self.player_id = player_id
+        self.player_count = player_count
+        self.is_human = False
+        self.name = f"P{player_id} [{display_name or 'AlphaBeta'}]"
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.verbose = verbose
+        self.tt = TranspositionTable(1 << 18)
+        self.last_stats = {}
+        self.book = book if book is not None else get_book()
+        self.last_tier = None
+
+    def _search_ranked(self, game, valid_moves):
+        """The search's best move followed by the other root moves by score."""
+        engine = AlphaBeta(game, tt=self.tt)
+        best, self.last_stats = engine.search(self.time_limit, self.max_depth)
+        if self.verbose:
+            print(f"🔎 {self.name} depth {self.last_stats['depth']} | "
+                  f"{self.last_stats['nodes']} nodes | {self.last_stats['nps']} nps")
+
+        valid = set(valid_moves)
+        scores = engine.root_scores
+        ranked = []
+        if best is not None:
+            ranked.append((CELLS[best[0]], CELLS[best[1]]))
+        for s, e in sorted(scores, key=scores.get, reverse=True):
+            move = (CELLS[s], CELLS[e])
+            if move not in ranked:
+                ranked.append(move)
+        return [m for m in ranked if m in valid]
 
 class Referee:
-    def __init__(self):
+    def __init__(self, stream=False):
+        self.stream = stream
+        self.last_timing = {}
         groq_key = os.getenv("GROQ_API_KEY")
         if not groq_key:
             print("⚠️ Warning: GROQ_API_KEY not found, referee disabled")
             self.llm = None
         else:
-            self.llm = ChatGroq(
-                model_name="llama-3.3-70b-versatile",
-                groq_api_key=groq_key,
-                temperature=0.7
-            )
+            # Commentary queues behind player moves on the shared limiter
+            self.llm = pooled_llm("llama-3.3-70b-versatile", temperature=0.7,
+                                  priority=PRIORITY_COMMENTARY)
+
+    @staticmethod
+    def _three_words(text):
+        words = text.split()
+        return len(words) > 3 or (len(words) == 3 and text[-1:] in " .!?\n")
     
     def commentate(self, p, m):
         if not self.llm:
             return "Nice move!"
         try: 
-            response = self.llm.invoke([HumanMessage(content=f"React to {p}'s move {m} in exactly 3 words:")])
+            messages = [HumanMessage(content=f"React to {p}'s move {m} in exactly 3 words:")]
+            if self.stream:
+                text, ttft, elapsed = stream_until(self.llm, messages, self._three_words)
+                self.last_timing = {"ttft": ttft, "decision_time": elapsed}
+                return " ".join(text.split()[:3])
+            response = self.llm.invoke(messages)
             return response.content.strip()
         except Exception as e:
             print(f"Referee error: {e}")
@@ -0,0 +1,83 @@
+"""Headless games between agent specs, shared by the arena and the dataset exporter.
+
+Agent specs are NAME[:key=value,...] with NAME one of random, greedy,
+mcts (time, playouts, workers), alphabeta (time, depth) or an AIPlayer
+provider such as groq (top_k, stream, batch, deadline).
+"""
+import random
+import time
+
+from agents.players import AIPlayer, AlphaBetaPlayer, GreedyPlayer, MCTSPlayer, RandomPlayer
+
+
+def parse_spec(spec):
+    """'mcts:time=0.2,playouts=500' -> ('mcts', {'time': 0.2, 'playouts': 500})"""
+    name, _, rest = spec.partition(":")
+    opts = {}
+    for item in filter(None, rest.split(",")):
+        key, _, value = item.partition("=")
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                continue
+        opts[key] = value
+    return name.lower(), opts
+
+
+def build_player(spec, player_id, player_count, seed):
+    name, opts = parse_spec(spec)
+    if name == "random":
+        return RandomPlayer(player_id, seed=seed)
+    if name == "greedy":
+        return GreedyPlayer(player_id, player_count, seed=seed)
+    if name == "mcts":
+        # workers=1: callers already parallelise across games
+        return MCTSPlayer(player_id, player_count, time_limit=opts.get("time"),
+                          playouts=opts.get("playouts", 200 if "time" not in opts else None),
+                          workers=opts.get("workers", 1), seed=seed)
+    if name == "alphabeta":
+        return AlphaBetaPlayer(player_id, player_count, time_limit=opts.get("time", 0.1),
+                               max_depth=opts.get("depth", 32), verbose=False)
+    return AIPlayer(player_id, model_provider=name, player_count=player_count,
+                    top_k=opts.get("top_k", 8), stream=bool(opts.get("stream", 0)),
+                    batch=bool(opts.get("batch", 0)), deadline=opts.get("deadline", 10.0))
+
+
+def build_players(specs, seed):
+    """One player per seat, seeded from `seed` (which also seeds the global random module)."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    return [build_player(spec, i + 1, len(specs), rng.getrandbits(32)) for i, spec in enumerate(specs)]
+
+
+def close_players(players):
+    for p in players:
+        if hasattr(p, "close"):
+            p.close()
+
+
+def play(game, players, max_turns, on_move=None):
+    """Play until someone wins or max_turns turns have passed; returns (winner, turns played).
+
+    on_move(seat, player, move, seconds) runs before each move is applied,
+    so the game still shows the position it was chosen in.
+    """
+    turn = 0
+    for turn in range(1, max_turns + 1):
+        winner = game.check_winner()
+        if winner:
+            return winner, turn - 1
+        seat = (turn - 1) % len(players)
+        player = players[seat]
+        moves = game.get_valid_moves(player.player_id)
+        if not moves:
+            continue
+        t0 = time.perf_counter()
+        move = player.get_move(game.board, moves)
+        elapsed = time.perf_counter() - t0
+        if on_move is not None:
+            on_move(seat, player, move, elapsed)
+        game.apply_move(move[0], move[1])
+    return game.check_winner(), turn
@@ -0,0 +1,135 @@
+"""hexamind-arena: headless batch self-play between agent specs.
+
+    python arena.py --games 1000 --agents mcts:time=0.2 greedy --workers 8 --out results.jsonl
+
+Agent specs are NAME[:key=value,...] (see agents/selfplay.py): random,
+greedy, mcts, alphabeta or an AIPlayer provider such as groq.
+
+LLM batching (batch=1) needs games running concurrently in one process,
+so combine it with --threads.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from agents.selfplay import build_players, close_players, play
+from engine.logic import ChineseCheckers
+from engine.metrics import METRICS
+from engine.records import get_writer
+
+SUPPORTED_PLAYER_COUNTS = (2, 3, 6)
+
+
+def play_game(game_id, specs, seed, max_turns, record_dir=None):
+    """Play one game with no rendering or sleeps; returns a result record."""
+    player_count = len(specs)
+    game = ChineseCheckers(player_count=player_count)
+    players = build_players(specs, seed)
+
+    writer = get_writer(record_dir, "arena") if record_dir else None
+    if writer is not None:
+        writer.begin_game(specs, seed, player_count)
+
+    latencies = []
+
+    def on_move(seat, player, move, elapsed):
+        latencies.append(round(elapsed, 6))
+        METRICS.observe("hexamind_turn_seconds", elapsed, graph="arena", agent=specs[seat])
+        if writer is not None:
+            writer.add_move(player.player_id, move[0], move[1], game.get_move_path(move[0], move[1]),
+                            elapsed, getattr(player, "last_tier", None))
+
+    start = time.perf_counter()
+    try:
+        winner, turn = play(game, players, max_turns, on_move)
+    finally:
+        # The writer is shared by every game on this thread; always close this one out
+        if writer is not None:
+            writer.end_game(game.check_winner())
+        close_players(players)
+
+    return {
+        "game": game_id,
+        "seed": seed,
+        "agents": specs,
+        "winner": winner,
+        "turns": turn,
+        "duration": round(time.perf_counter() - start, 4),
+        "move_latency": latencies,
+    }
+
+
+def _rotated(specs, game_id, rotate):
+    # Rotate seats between games so no agent always moves first
+    if not rotate:
+        return list(specs)
+    k = game_id % len(specs)
+    return list(specs[k:] + specs[:k])
+
+
+def run_arena(specs, games, workers, seed, max_turns, out, rotate=True, threads=1, record_dir=None):
+    jobs = [(i, _rotated(specs, i, rotate), seed + i, max_turns, record_dir) for i in range(games)]
+    wins = {}
+
+    def record(result):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        if result["winner"]:
+            agent = result["agents"][result["winner"] - 1]
+            wins[agent] = wins.get(agent, 0) + 1
+
+    if threads > 1:
+        # I/O-bound (LLM) games: run concurrently in-process so they can share a batch broker
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(play_game, *job) for job in jobs]
+            for future in as_completed(futures):
+                record(future.result())
+    elif workers <= 1:
+        for job in jobs:
+            record(play_game(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_game, *job) for job in jobs]
+            for future in as_completed(futures):
+                record(future.result())
+    return wins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="hexamind-arena", description="Headless Hexamind self-play tournaments")
+    parser.add_argument("--agents", nargs="+", required=True, help="one agent spec per seat")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i uses seed + i")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="run this many games concurrently in one process (for LLM agents)")
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--no-rotate", action="store_true", help="keep seat order fixed across games")
+    parser.add_argument("--out", default="-", help="JSONL output path ('-' for stdout)")
+    parser.add_argument("--records", help="append binary game records (.hxr) to this directory")
+    parser.add_argument("--metrics", help="write latency metrics here (*.jsonl appends JSONL, "
+                                          "else Prometheus text); covers in-process games only")
+    args = parser.parse_args(argv)
+
+    if len(args.agents) not in SUPPORTED_PLAYER_COUNTS:
+        parser.error(f"need {', '.join(map(str, SUPPORTED_PLAYER_COUNTS))} agents, got {len(args.agents)}")
+
+    out = sys.stdout if args.out == "-" else open(args.out, "a")
+    start = time.perf_counter()
+    try:
+        wins = run_arena(args.agents, args.games, args.workers, args.seed, args.max_turns, out,
+                         rotate=not args.no_rotate, threads=args.threads, record_dir=args.records)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"🏟️  {args.games} games in {elapsed:.1f}s | wins: {wins}", file=sys.stderr)
+    if args.metrics:
+        METRICS.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Opening book: position -> move statistics built from archived games.
+
+    python -m engine.book --records games/ --out book.hxb --max-ply 20
+
+The file is a 16-byte header followed by N entries sorted by
+(hash, player count, start, end), stored column-wise: first all N hashes,
+then N fixed-width rows with the remaining fields.
+
+    hash          uint64  Zobrist hash with the mover as side to move
+    player_count  uint8
+    start, end    uint8   cell ids
+    visits        uint32  games that played this move here
+    wins          uint32  of those, games the mover went on to win
+
+OpeningBook memory-maps the file on first use and binary-searches the
+contiguous hash array in place, so a lookup touches a handful of pages
+however big the book gets.
+"""
+import argparse
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+from engine.logic import ChineseCheckers, CELLS, ZOBRIST_SIDE
+
+MAGIC = b"HXB2"
+HEADER = struct.Struct("<4sI8x")
+ENTRY_DTYPE = np.dtype([
+    ("hash", "<u8"),
+    ("player_count", "u1"),
+    ("start", "u1"),
+    ("end", "u1"),
+    ("pad", "u1"),
+    ("visits", "<u4"),
+    ("wins", "<u4"),
+])
+assert ENTRY_DTYPE.itemsize == 20
+# On-disk row: every field but the hash, which lives in its own array
+ROW_DTYPE = np.dtype([(name, ENTRY_DTYPE.fields[name][0]) for name in ENTRY_DTYPE.names if name != "hash"])
+assert ROW_DTYPE.itemsize == 12
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hexamind", "book.hxb")
+
+
+def position_key(game, player_id):
+    """game.hash re-keyed with player_id to move."""
+    return game.hash ^ ZOBRIST_SIDE[game.to_move] ^ ZOBRIST_SIDE[player_id]
+
+
+def board_key(board_state, player_count, player_id):
+    game = ChineseCheckers(player_count)
+    game.board = board_state
+    return position_key(game, player_id)
+
+
+def build_book(archive, max_ply=20):
+    """Count (position, move) visits and mover wins over the first max_ply plies of every game."""
+    stats = {}
+    for record in archive:
+        n = min(len(record), max_ply)
+        if not n:
+            continue
+        game = ChineseCheckers(record.player_count)
+        starts = record.moves["start"][:n].tolist()
+        ends = record.moves["end"][:n].tolist()
+        for s, e in zip(starts, ends):
+            mover = game.cells[s]
+            key = (position_key(game, mover), record.player_count, s, e)
+            entry = stats.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += record.winner == mover
+            game.make(s, e)
+
+    table = np.zeros(len(stats), dtype=ENTRY_DTYPE)
+    for i, ((h, count, s, e), (visits, wins)) in enumerate(sorted(stats.items())):
+        table[i] = (h, count, s, e, 0, visits, wins)
+    return table
+
+
+def write_book(table, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(table)))
+        f.write(np.ascontiguousarray(table["hash"]).tobytes())
+        rows = np.zeros(len(table), dtype=ROW_DTYPE)
+        for name in ROW_DTYPE.names:
+            rows[name] = table[name]
+        f.write(rows.tobytes())
+    os.replace(tmp, path)
+
+
+class OpeningBook:
+    """Read-only, lazily memory-mapped view of a book file."""
+
+    def __init__(self, path, min_visits=2):
+        self.path = path
+        self.min_visits = min_visits
+        self._columns = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def columns(self):
+        """(hashes, rows) memory-mapped from the file; hashes is a contiguous uint64 array."""
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    with open(self.path, "rb") as f:
+                        magic, count = HEADER.unpack(f.read(HEADER.size))
+                    if magic != MAGIC:
+                        raise ValueError(f"{self.path} is not an opening book")
+                    if count == 0:
+                        self._columns = np.zeros(0, dtype="<u8"), np.zeros(0, dtype=ROW_DTYPE)
+                    else:
+                        hashes = np.memmap(self.path, dtype="<u8", mode="r", offset=HEADER.size, shape=(count,))
+                        rows = np.memmap(self.path, dtype=ROW_DTYPE, mode="r",
+                                         offset=HEADER.size + hashes.nbytes, shape=(count,))
+                        self._columns = hashes, rows
+        return self._columns
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def lookup(self, key, player_count):
+        """[(start, end, visits, wins)] recorded for this position, coordinates as (q, r)."""
+        hashes, rows = self.columns
+        key = np.uint64(key)
+        lo = int(hashes.searchsorted(key, side="left"))
+        hi = int(hashes.searchsorted(key, side="right"))
+        return [(CELLS[row["start"]], CELLS[row["end"]], int(row["visits"]), int(row["wins"]))
+                for row in rows[lo:hi] if row["player_count"] == player_count]
+
+    def choose(self, key, valid_moves, player_count):
+        """Best book move for position `key` (smoothed win rate, then visits), or None."""
+        best, best_score = None, None
+        valid = set(valid_moves)
+        for start, end, visits, wins in self.lookup(key, player_count):
+            if visits < self.min_visits or (start, end) not in valid:
+                continue
+            score = ((wins + 1) / (visits + 2), visits)
+            if best_score is None or score > best_score:
+                best, best_score = (start, end), score
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return best
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_book():
+    """Process-wide book at $HEXAMIND_BOOK (default ~/.cache/hexamind/book.hxb); None if absent."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            path = os.getenv("HEXAMIND_BOOK", DEFAULT_PATH)
+            _shared = OpeningBook(path) if path and os.path.exists(path) else False
+        return _shared or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="hexamind-book", description="Build an opening book from game records")
+    parser.add_argument("--records", required=True, help="directory (or file) of .hxr game records")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--max-ply", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from engine.records import RecordArchive
+    archive = RecordArchive(args.records)
+    table = build_book(archive, args.max_ply)
+    write_book(table, args.out)
+    print(f"📖 {len(table)} book entries from {len(archive)} games → {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
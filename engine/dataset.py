@@ -0,0 +1,329 @@
+"""hexamind-dataset: stream self-play positions into NumPy training shards.
+
+    python -m engine.dataset --records games/ --out data/ --shard-size 65536
+    python -m engine.dataset --selfplay 1000 --agents mcts:time=0.1 greedy --out data/
+
+Each sample is (board planes, side to move, move played, outcome):
+
+    board    uint8 (6, NUM_CELLS)  occupancy plane per player id 1..6
+    side     uint8                 player to move
+    move     uint8 (2,)            start / end cell id
+    outcome  int8                  +1 side to move went on to win, -1 another
+                                   player won, 0 no winner
+    winner   uint8                 winning player id (0 = none)
+    players  uint8                 player count of the game
+    eval     float32               engine.evaluate score of the side to move
+                                   minus the best other player's
+
+Shards are fixed-size shard-NNNNNN.npz files plus manifest.json, which
+records how far each source has been written so an interrupted export
+resumes where it stopped, producing the same shards as an uninterrupted
+one. Only one shard's worth of samples is ever held in RAM.
+"""
+import argparse
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+
+from engine.evaluate import evaluate_batch
+from engine.logic import ChineseCheckers, CELLS, CELL_ID, NUM_CELLS, TRIANGLES, HOME_TRIANGLES
+
+PLANES = 6
+MANIFEST_VERSION = 3
+_PIDS = np.arange(1, PLANES + 1, dtype=np.uint8)[:, None]
+
+
+def _rotate(pos):
+    # 60 degree rotation in axial coordinates
+    q, r = pos
+    return -r, q + r
+
+
+def _build_rotations():
+    """ROTATIONS[k][c] -> id of cell c rotated k * 60 degrees; TRIANGLE_ROT[k][t] likewise."""
+    step = np.array([CELL_ID[_rotate(pos)] for pos in CELLS], dtype=np.intp)
+    rotations = [np.arange(NUM_CELLS, dtype=np.intp)]
+    for _ in range(5):
+        rotations.append(step[rotations[-1]])
+    index = {frozenset(tri): t for t, tri in enumerate(TRIANGLES)}
+    triangle_rot = [[index[frozenset(perm[list(tri)].tolist())] for tri in TRIANGLES] for perm in rotations]
+    return rotations, triangle_rot
+
+
+# The star layout built in engine.logic is closed under rotation but not
+# under reflection, so the symmetry group used for augmentation is C6.
+ROTATIONS, TRIANGLE_ROT = _build_rotations()
+
+
+def symmetries(player_count):
+    """(cell permutation, player relabel table) for every rotation that maps
+    this player count's home triangles onto each other; identity first."""
+    homes = HOME_TRIANGLES[player_count]
+    owner = {tid: pid for pid, tid in homes.items()}
+    out = []
+    for perm, tri_rot in zip(ROTATIONS, TRIANGLE_ROT):
+        relabel = np.zeros(7, dtype=np.uint8)
+        for pid, tid in homes.items():
+            target = owner.get(tri_rot[tid])
+            if target is None:
+                break
+            relabel[pid] = target
+        else:
+            out.append((perm, relabel))
+    return out
+
+
+def encode_planes(cells):
+    """(6, NUM_CELLS) uint8 occupancy planes from a ChineseCheckers.cells array."""
+    cells = np.frombuffer(cells, dtype=np.uint8)
+    return (cells[None, :] == _PIDS).astype(np.uint8)
+
+
+def relative_eval(cells, side, player_count):
+    """evaluate_batch score of `side` minus the best other player's, for (N, NUM_CELLS) boards."""
+    scores = evaluate_batch(cells, player_count)
+    rows = np.arange(len(side))
+    own = scores[rows, side]
+    others = np.full_like(scores, -np.inf)
+    active = sorted(HOME_TRIANGLES[player_count])
+    others[:, active] = scores[:, active]
+    others[rows, side] = -np.inf
+    return own - others.max(axis=1)
+
+
+def outcome_for(side, winner):
+    if not winner:
+        return 0
+    return 1 if winner == side else -1
+
+
+def game_samples(player_count, moves, winner, augment=True):
+    """Yield (cells, side, start, end, outcome, winner) for each move of a game,
+    once per board symmetry when augment is set."""
+    game = ChineseCheckers(player_count)
+    syms = symmetries(player_count) if augment else symmetries(player_count)[:1]
+    for start, end in moves:
+        cells = np.frombuffer(bytes(game.cells), dtype=np.uint8)
+        side = game.cells[start]
+        for perm, relabel in syms:
+            rotated = np.empty_like(cells)
+            rotated[perm] = relabel[cells]
+            w = relabel[winner] if winner else 0
+            s = relabel[side]
+            yield rotated, s, perm[start], perm[end], outcome_for(s, w), w
+        game.make(start, end)
+
+
+class ShardWriter:
+    """Buffers samples into fixed-size shards and tracks per-game progress.
+
+    Games are identified by (source, index) - an archive file and the game's
+    position in it, or a self-play run and its game number - and arrive in
+    index order within each source. manifest.json records, per source, how
+    many leading games are fully on disk, plus how many samples of the one
+    game straddling the last flushed shard were written; add_game() skips
+    exactly those on a rerun. The manifest stays the same size however many
+    games are exported.
+    """
+
+    def __init__(self, out_dir, shard_size=65536, compress=False):
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.compress = compress
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest_path = os.path.join(out_dir, "manifest.json")
+        self.manifest = {"version": MANIFEST_VERSION, "shard_size": shard_size, "shards": [], "samples": 0,
+                         "done": {}, "partial": None}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"{out_dir} was written by an older exporter; export into a new directory")
+            if self.manifest["shard_size"] != shard_size:
+                raise ValueError(f"{out_dir} was written with shard_size={self.manifest['shard_size']}")
+        self.board = np.zeros((shard_size, PLANES, NUM_CELLS), dtype=np.uint8)
+        self.side = np.zeros(shard_size, dtype=np.uint8)
+        self.move = np.zeros((shard_size, 2), dtype=np.uint8)
+        self.outcome = np.zeros(shard_size, dtype=np.int8)
+        self.winner = np.zeros(shard_size, dtype=np.uint8)
+        self.players = np.zeros(shard_size, dtype=np.uint8)
+        self.n = 0
+        self._sources = []  # [source, index, samples in buffer, finished] in buffer order
+
+    def skip_count(self, source, index):
+        """None if the game is fully exported, else how many of its samples to skip."""
+        if index < self.manifest["done"].get(source, 0):
+            return None
+        partial = self.manifest["partial"]
+        if partial and partial["source"] == source and partial["index"] == index:
+            return partial["samples"]
+        return 0
+
+    def add_game(self, source, index, samples, player_count):
+        skip = self.skip_count(source, index)
+        if skip is None:
+            return 0
+        entry = [source, index, 0, False]
+        self._sources.append(entry)
+        written = 0
+        for i, (cells, side, start, end, outcome, winner) in enumerate(samples):
+            if i < skip:
+                continue
+            j = self.n
+            self.board[j] = encode_planes(cells)
+            self.side[j] = side
+            self.move[j] = (start, end)
+            self.outcome[j] = outcome
+            self.winner[j] = winner
+            self.players[j] = player_count
+            self.n += 1
+            entry[2] += 1
+            written += 1
+            if self.n == self.shard_size:
+                self.flush()
+        # Recorded as done at the next flush, after every game buffered before it
+        entry[3] = True
+        return written
+
+    def flush(self):
+        """Write the buffered samples as the next shard (short shards only at close)."""
+        if not self.n and not self._sources:
+            return
+        if self.n:
+            name = f"shard-{len(self.manifest['shards']):06d}.npz"
+            path = os.path.join(self.out_dir, name)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                _save_npz(f, self.compress, board=self.board[:self.n], side=self.side[:self.n],
+                          move=self.move[:self.n], outcome=self.outcome[:self.n], winner=self.winner[:self.n],
+                          players=self.players[:self.n], eval=self._evaluate())
+            os.replace(tmp, path)
+            self.manifest["shards"].append({"file": name, "samples": self.n})
+            self.manifest["samples"] += self.n
+
+        for source, index, count, finished in self._sources:
+            partial = self.manifest["partial"]
+            same = partial is not None and (partial["source"], partial["index"]) == (source, index)
+            if finished:
+                self.manifest["done"][source] = max(self.manifest["done"].get(source, 0), index + 1)
+                if same:
+                    self.manifest["partial"] = None
+            elif same:
+                partial["samples"] += count
+            else:
+                self.manifest["partial"] = {"source": source, "index": index, "samples": count}
+        last = self._sources[-1] if self._sources and not self._sources[-1][3] else None
+        if last is not None:
+            last[2] = 0
+        self._sources = [last] if last is not None else []
+        self.n = 0
+        self._save_manifest()
+
+    def _evaluate(self):
+        """Heuristic score of every buffered sample, one vectorized pass per player count."""
+        n = self.n
+        cells = (self.board[:n] * _PIDS).sum(axis=1, dtype=np.int8)
+        out = np.zeros(n, dtype=np.float32)
+        for count in np.unique(self.players[:n]).tolist():
+            rows = np.flatnonzero(self.players[:n] == count)
+            out[rows] = relative_eval(cells[rows], self.side[rows], count)
+        return out
+
+    def _save_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.manifest_path)
+
+    def close(self):
+        self.flush()
+
+
+def _save_npz(f, compress, **arrays):
+    """np.savez with fixed member timestamps, so the same samples give the same bytes."""
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(f, "w", compression=compression) as zf:
+        for name, array in arrays.items():
+            info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = compression
+            with zf.open(info, "w", force_zip64=True) as member:
+                np.lib.format.write_array(member, np.asanyarray(array))
+
+
+def export_archive(archive, writer, augment=True):
+    """Stream every game of an engine.records.RecordArchive into writer."""
+    total = 0
+    seen = {}
+    for i in range(len(archive)):
+        m = archive.index[i][0]
+        source = os.path.basename(archive.files[m])
+        index = seen[m] = seen.get(m, -1) + 1
+        if writer.skip_count(source, index) is None:
+            continue
+        record = archive[i]
+        moves = zip(record.moves["start"].tolist(), record.moves["end"].tolist())
+        total += writer.add_game(source, index, game_samples(record.player_count, moves, record.winner, augment),
+                                 record.player_count)
+    return total
+
+
+def play_selfplay(specs, seed, max_turns):
+    """Play one game; returns (moves as cell id pairs, winner)."""
+    # Imported here so exporting archived records doesn't load the LLM stack
+    from agents.selfplay import build_players, close_players, play
+
+    game = ChineseCheckers(len(specs))
+    players = build_players(specs, seed)
+    moves = []
+    try:
+        winner, _ = play(game, players, max_turns,
+                         lambda seat, player, move, elapsed: moves.append((CELL_ID[move[0]], CELL_ID[move[1]])))
+    finally:
+        close_players(players)
+    return moves, winner
+
+
+def export_selfplay(specs, games, seed, max_turns, writer, augment=True):
+    source = f"selfplay:{'/'.join(specs)}:{seed}"
+    total = 0
+    for i in range(games):
+        if writer.skip_count(source, i) is None:
+            continue
+        moves, winner = play_selfplay(specs, seed + i, max_turns)
+        total += writer.add_game(source, i, game_samples(len(specs), moves, winner, augment), len(specs))
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="hexamind-dataset", description="Export training shards from Hexamind games")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--records", help="directory (or file) of .hxr game records")
+    source.add_argument("--selfplay", type=int, metavar="GAMES", help="play this many games live")
+    parser.add_argument("--agents", nargs="+", default=["greedy", "greedy"], help="agent specs for --selfplay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--out", required=True, help="shard directory (resumed if it has a manifest)")
+    parser.add_argument("--shard-size", type=int, default=65536)
+    parser.add_argument("--compress", action="store_true", help="write compressed .npz shards")
+    parser.add_argument("--no-augment", action="store_true", help="skip rotation augmentation")
+    args = parser.parse_args(argv)
+
+    writer = ShardWriter(args.out, args.shard_size, args.compress)
+    try:
+        if args.records:
+            from engine.records import RecordArchive
+            total = export_archive(RecordArchive(args.records), writer, not args.no_augment)
+        else:
+            total = export_selfplay(args.agents, args.selfplay, args.seed, args.max_turns, writer,
+                                    not args.no_augment)
+    finally:
+        writer.close()
+    print(f"📦 {total} samples written | {writer.manifest['samples']} in {len(writer.manifest['shards'])} shards",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
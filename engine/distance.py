@@ -0,0 +1,51 @@
+import numpy as np
+
+from engine.logic import CELLS, CELL_ID, HOME_TRIANGLES, NUM_CELLS, goal_triangle
+
+# === Geometry tables (built once at import) ===
+COORDS = np.array(CELLS, dtype=np.int16)  # (NUM_CELLS, 2) axial q, r
+
+_dq = COORDS[:, 0][:, None] - COORDS[:, 0][None, :]
+_dr = COORDS[:, 1][:, None] - COORDS[:, 1][None, :]
+# HEX_DIST[a, b] -> hex (cube) distance between cells a and b
+HEX_DIST = np.maximum(np.maximum(np.abs(_dq), np.abs(_dr)), np.abs(_dq + _dr)).astype(np.int8)
+CENTER = CELL_ID[(0, 0)]
+
+
+# GOAL_DIST[player_count][pid, c] -> steps from cell c to a finished slot for pid.
+# Inside the goal triangle it is the distance to the back row (the cells furthest
+# from the center) so pieces keep being pulled deeper; outside it is the hex
+# distance to the goal triangle on top of the goal's deepest value, so entering
+# the goal is always progress. Row 0 unused so rows line up with player ids.
+GOAL_DIST = {}
+# Same tables as plain lists, for scalar lookups inside Python search loops
+GOAL_DIST_LIST = {}
+
+for _count, _homes in HOME_TRIANGLES.items():
+    _table = np.zeros((7, NUM_CELLS), dtype=np.int8)
+    for _pid in _homes:
+        _goal = np.array(goal_triangle(_count, _pid))
+        _depth = HEX_DIST[CENTER, _goal]
+        _back = _goal[_depth == _depth.max()]
+        _inside = HEX_DIST[_goal][:, _back].min(axis=1)
+        _table[_pid] = _inside.max() + HEX_DIST[:, _goal].min(axis=1)
+        _table[_pid, _goal] = _inside
+    _table.setflags(write=False)
+    GOAL_DIST[_count] = _table
+    GOAL_DIST_LIST[_count] = _table.tolist()
+
+
+def move_ids(moves):
+    """[((q, r), (q, r)), ...] -> (M, 2) int array of (start, end) cell ids."""
+    ids = np.fromiter((CELL_ID[p] for move in moves for p in move[:2]), dtype=np.intp,
+                      count=2 * len(moves))
+    return ids.reshape(-1, 2)
+
+
+def score_moves(moves, player_id, player_count=2):
+    """Goal-distance gain of every move (positive = closer to the goal)."""
+    if len(moves) == 0:
+        return np.zeros(0, dtype=np.int16)
+    ids = moves if isinstance(moves, np.ndarray) else move_ids(moves)
+    dist = GOAL_DIST[player_count][player_id].astype(np.int16)
+    return dist[ids[:, 0]] - dist[ids[:, 1]]
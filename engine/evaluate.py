@@ -0,0 +1,64 @@
+import numpy as np
+
+from engine.distance import GOAL_DIST
+from engine.logic import HOME_TRIANGLES, JUMPS, NUM_CELLS, TRIANGLES
+
+# Every (from, over, land) jump on the board as flat index arrays
+_jumps = [(c, over, land) for c in range(NUM_CELLS) for over, land in JUMPS[c]]
+JUMP_FROM, JUMP_OVER, JUMP_LAND = (np.array(col, dtype=np.intp) for col in zip(*_jumps))
+
+# Feature weights for the combined score (higher score = better for that player)
+W_DIST = 1.0
+W_STRAGGLER = 2.0
+W_HOME = 1.5
+W_JUMP = 0.5
+
+
+def board_features(boards, player_count=2):
+    """Per-player feature planes for a batch of boards.
+
+    boards: (N, NUM_CELLS) int array of player ids (0 = empty).
+    Returns a dict of (N, 7) arrays indexed [board, pid] (column 0 unused):
+      dist       summed goal distance of the player's pieces
+      straggler  goal distance of the player's furthest-behind piece
+      home       pieces still sitting in the player's home triangle
+      jumps      single jumps available that bring a piece closer to goal
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim == 1:
+        boards = boards[None, :]
+    n = boards.shape[0]
+    dist_table = GOAL_DIST[player_count].astype(np.int32)
+    occupied = boards != 0
+    jump_open = occupied[:, JUMP_OVER] & ~occupied[:, JUMP_LAND]
+    owners = boards[:, JUMP_FROM]
+
+    feats = {name: np.zeros((n, 7), dtype=np.float32) for name in ("dist", "straggler", "home", "jumps")}
+    for pid, tid in HOME_TRIANGLES[player_count].items():
+        mine = boards == pid
+        dist = dist_table[pid]
+        feats["dist"][:, pid] = mine @ dist
+        feats["straggler"][:, pid] = np.where(mine, dist, 0).max(axis=1)
+        feats["home"][:, pid] = mine[:, TRIANGLES[tid]].sum(axis=1)
+        forward = dist[JUMP_FROM] > dist[JUMP_LAND]
+        feats["jumps"][:, pid] = ((owners == pid) & jump_open & forward).sum(axis=1)
+    return feats
+
+
+def evaluate_batch(boards, player_count=2):
+    """(N, NUM_CELLS) boards -> (N, 7) float32 scores, higher is better, column 0 unused."""
+    f = board_features(boards, player_count)
+    scores = (W_JUMP * f["jumps"]
+              - W_DIST * f["dist"]
+              - W_STRAGGLER * f["straggler"]
+              - W_HOME * f["home"])
+    inactive = [pid for pid in range(7) if pid not in HOME_TRIANGLES[player_count]]
+    scores[:, inactive] = 0.0
+    return scores
+
+
+def evaluate_game(game):
+    """Single-board convenience wrapper: {pid: score} for a ChineseCheckers game."""
+    board = np.frombuffer(bytes(game.cells), dtype=np.int8)
+    scores = evaluate_batch(board[None, :], game.player_count)[0]
+    return {pid: float(scores[pid]) for pid in game.players}
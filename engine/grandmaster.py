@@ -1,104 +1,162 @@
 from typing import TypedDict, List, Annotated, Optional
-import math
 from langgraph.graph import StateGraph, END
+from engine.distance import score_moves
+from engine.logic import CELL_ID
+from engine.metrics import METRICS
+from engine.registry import Registry, compiled_graph
+
+# Relaxed Rule: allow moves that don't go backwards by more than 2 units,
+# so pieces can side-step around blockers.
+MIN_GAIN = -2.0
+MAX_ATTEMPTS = 3
 
 class GrandmasterState(TypedDict):
-    board: dict
+    # Board and move list stay in TURNS; the channel carries only the turn id
+    turn_id: str
     player_id: int
-    valid_moves: List[tuple]
     proposed_move: Optional[tuple]
+    proposals: List[tuple]
+    rejected: List[tuple]
     critique: str
+    feedback: str
     attempt_count: int
     final_move: Optional[tuple]
 
+class _Turn:
+    """One run() call: the graph that owns it plus its board and valid moves."""
+    def __init__(self, graph, board, valid_moves):
+        self.graph = graph
+        self.board = board
+        self.valid_moves = valid_moves
+
+# turn_id -> _Turn
+TURNS = Registry("turn")
+
+def _generator(state: GrandmasterState):
+    with METRICS.timer("hexamind_node_seconds", graph="grandmaster", node="generator"):
+        return TURNS.get(state['turn_id']).graph.generate_move(state)
+
+def _critic(state: GrandmasterState):
+    with METRICS.timer("hexamind_node_seconds", graph="grandmaster", node="critic"):
+        return TURNS.get(state['turn_id']).graph.math_critic(state)
+
+def _check_approval(state: GrandmasterState):
+    if state.get('critique') == "approved": return "approved"
+    return "retry"
+
+def _build_app():
+    workflow = StateGraph(GrandmasterState)
+    workflow.add_node("generator", _generator)
+    workflow.add_node("critic", _critic)
+
+    workflow.set_entry_point("generator")
+    workflow.add_edge("generator", "critic")
+
+    workflow.add_conditional_edges(
+        "critic",
+        _check_approval,
+        {
+            "approved": END,
+            "retry": "generator"
+        }
+    )
+    return workflow.compile()
+
 class GrandmasterGraph:
-    def __init__(self, ai_player, game_logic):
+    """Generator -> critic reflexion loop.
+
+    With top_k=1 the generator proposes one move per LLM call. With
+    top_k > 1 (and a player that has propose_moves) it asks for a ranked
+    list in one call; the critic scores the whole list in one vectorized
+    goal-distance lookup and approves the best-ranked acceptable move, so
+    the loop only retries when every proposal is rejected.
+    """
+
+    def __init__(self, ai_player, game_logic, top_k=3):
         self.ai = ai_player
         self.game = game_logic
-        
-        workflow = StateGraph(GrandmasterState)
-        workflow.add_node("generator", self.generate_move)
-        workflow.add_node("critic", self.math_critic) 
-        
-        workflow.set_entry_point("generator")
-        
-        workflow.add_conditional_edges(
-            "critic",
-            self.check_approval,
-            {
-                "approved": END,
-                "retry": "generator"
-            }
-        )
-        self.app = workflow.compile()
+        self.top_k = top_k if hasattr(ai_player, "propose_moves") else 1
+        self.last_tier = None
+        self.app = compiled_graph("grandmaster", _build_app)
 
     def generate_move(self, state: GrandmasterState):
         attempts = state.get("attempt_count", 0)
-        # Generate a move using the AI
-        move = self.ai.get_move(state['board'], state['valid_moves'])
+        turn = TURNS.get(state['turn_id'])
+        if self.top_k > 1:
+            # One call, ranked list; the critic's numbers go back in on retries
+            proposals = self.ai.propose_moves(turn.board, turn.valid_moves, k=self.top_k,
+                                              feedback=state.get('feedback', ""),
+                                              exclude=state.get('rejected', []))
+            if not proposals:
+                proposals = [self.ai.get_move(turn.board, turn.valid_moves)]
+        else:
+            # Generate a move using the AI
+            proposals = [self.ai.get_move(turn.board, turn.valid_moves)]
         return {
-            "proposed_move": move,
+            "proposed_move": proposals[0],
+            "proposals": proposals,
             "attempt_count": attempts + 1
         }
 
     def math_critic(self, state: GrandmasterState):
-        move = state['proposed_move']
-        start, end = move
+        proposals = state.get('proposals') or [state['proposed_move']]
         player_id = state['player_id']
         attempts = state['attempt_count']
-        
-        # --- 1. DEFINE TARGETS (Matches Logic.py) ---
-        target = (0,0)
-        if player_id == 1: target = (0, 4)
-        elif player_id == 2: target = (-4, 0) 
-        elif player_id == 3: target = (4, -4)
-        
-        # --- 2. CALCULATE DISTANCE ---
-        dist_start = math.sqrt((start[0]-target[0])**2 + (start[1]-target[1])**2)
-        dist_end = math.sqrt((end[0]-target[0])**2 + (end[1]-target[1])**2)
-        
-        improvement = dist_start - dist_end
-        
-        # --- 3. DECISION LOGIC ---
-        # Relaxed Rule: Allow moves that don't go backwards by more than 2 units
-        # This allows side-stepping around blockers.
-        is_acceptable = improvement > -2.0
-        
-        # FORCE APPROVE if:
-        # A. We tried 3 times already
-        # B. The move is acceptable
-        if attempts >= 3 or is_acceptable:
-            # If we are forcing a "bad" move on attempt 3, so be it. Better than crashing.
-            return {"critique": "approved", "final_move": move}
-        
-        # Reject bad moves (moving directly backwards)
+
+        # --- 1. DISTANCE GAIN (hex steps towards the goal triangle), all proposals at once ---
+        gains = score_moves(proposals, player_id, self.game.player_count)
+
+        # --- 2. DECISION LOGIC: first acceptable proposal in the generator's ranking ---
+        for move, gain in zip(proposals, gains):
+            if gain > MIN_GAIN:
+                return {"critique": "approved", "final_move": move}
+
+        # FORCE APPROVE after MAX_ATTEMPTS: the least-bad proposal. Better than crashing.
+        if attempts >= MAX_ATTEMPTS:
+            return {"critique": "approved", "final_move": proposals[int(gains.argmax())]}
+
+        # Reject bad moves (moving directly backwards), saying by how much,
+        # in the prompt's own start>end cell-id notation
+        METRICS.inc("hexamind_critic_retries_total")
+        feedback = "; ".join(
+            f"{CELL_ID[move[0]]}>{CELL_ID[move[1]]}{int(gain):+d} (need > {MIN_GAIN:+.0f})"
+            for move, gain in zip(proposals, gains)
+        )
         return {
-            "critique": "retry", 
-            "final_move": None 
+            "critique": "retry",
+            "feedback": feedback,
+            "rejected": list(state.get('rejected') or []) + list(proposals),
+            "final_move": None
         }
 
-    def check_approval(self, state: GrandmasterState):
-        if state.get('critique') == "approved": return "approved"
-        return "retry"
-
     def run(self, board, player_id, valid_moves):
+        turn = _Turn(self, board, valid_moves)
         initial = {
-            "board": board, 
-            "player_id": player_id, 
-            "valid_moves": valid_moves, 
+            "turn_id": TURNS.register(turn),
+            "player_id": player_id,
             "attempt_count": 0,
             "critique": "",
+            "feedback": "",
             "proposed_move": None,
+            "proposals": [],
+            "rejected": [],
             "final_move": None
         }
-        
+
         # Run graph with a higher recursion limit just in case
         config = {"recursion_limit": 10}
-        res = self.app.invoke(initial, config=config)
-        
-        # Final Safety Net: If graph somehow failed to set final_move, pick random
+        try:
+            with METRICS.timer("hexamind_turn_seconds", graph="grandmaster"):
+                res = self.app.invoke(initial, config=config)
+        finally:
+            TURNS.release(initial["turn_id"])
+
+        # Final Safety Net: If graph somehow failed to set final_move, take the
+        # best goal-distance move rather than a random one
         if res.get('final_move') is None:
-            import random
-            return random.choice(valid_moves)
-            
-        return res['final_move']
\ No newline at end of file
+            self.last_tier = "engine"
+            gains = score_moves(valid_moves, player_id, self.game.player_count)
+            return valid_moves[int(gains.argmax())]
+
+        self.last_tier = getattr(self.ai, "last_tier", None)
+        return res['final_move']
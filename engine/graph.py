@@ -1,6 +1,11 @@
-from typing import TypedDict, List, Any
+import asyncio
+import inspect
+from typing import TypedDict, List, Optional
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from engine.logic import ChineseCheckers
+from engine.metrics import METRICS
+from engine.registry import Registry, compiled_graph
 # Use Grandmaster if available, else simple
 try:
     from engine.grandmaster import GrandmasterGraph
@@ -10,56 +15,181 @@ except ImportError:
 
 from agents.players import AIPlayer, HumanPlayer
 
+def _move_log(player, move):
+    # Tag moves with the fallback tier that decided them (book / cache / llm / engine / random)
+    tier = getattr(player, "last_tier", None)
+    return f"{player.name} moved {move}" + (f" [{tier}]" if tier else "")
+
 class GameState(TypedDict):
-    board: dict
+    # Kept deliberately small: the game and its players live in GAMES,
+    # the channel only carries the id, a board hash and the move delta.
+    game_id: str
+    board_hash: int
     current_player_idx: int
-    players: List[Any]
     turn_count: int
-    last_move: str
+    last_move: Optional[tuple]
     logs: List[str]
 
+# game_id -> HexamindGraph
+GAMES = Registry("game")
+
+def _agent_node(state: GameState):
+    with METRICS.timer("hexamind_node_seconds", graph="hexamind", node="agent_move"):
+        return GAMES.get(state['game_id']).agent_node(state)
+
+async def _aagent_node(state: GameState):
+    with METRICS.timer("hexamind_node_seconds", graph="hexamind", node="agent_move"):
+        return await GAMES.get(state['game_id']).aagent_node(state)
+
+def _build_app():
+    workflow = StateGraph(GameState)
+    # Sync node for invoke(), async twin for ainvoke()
+    workflow.add_node("agent_move", RunnableLambda(_agent_node, afunc=_aagent_node))
+    workflow.set_entry_point("agent_move")
+    workflow.add_edge("agent_move", END) # Simple loop for now
+    return workflow.compile()
+
 class HexamindGraph:
-    def __init__(self, players):
-        self.game_logic = ChineseCheckers(player_count=len(players))
+    def __init__(self, players, game=None):
+        # Pass the UI's game to share its board instead of copying it each turn
+        self.game_logic = game if game is not None else ChineseCheckers(player_count=len(players))
         self.players = players
-        
-        workflow = StateGraph(GameState)
-        workflow.add_node("agent_move", self.agent_node)
-        workflow.set_entry_point("agent_move")
-        workflow.add_edge("agent_move", END) # Simple loop for now
-        self.app = workflow.compile()
+        self.game_id = GAMES.register(self)
+        self.app = compiled_graph("hexamind", _build_app)
 
     def agent_node(self, state: GameState):
         p_idx = state['current_player_idx']
-        player = state['players'][p_idx]
-        
-        self.game_logic.board = state['board']
+        player = self.players[p_idx]
+
         valid_moves = self.game_logic.get_valid_moves(player.player_id)
 
         if not valid_moves:
             return {"logs": [f"{player.name} stuck!"]}
 
-        # If human, we expect move to be handled by UI, but if we reach here 
+        # If human, we expect move to be handled by UI, but if we reach here
         # for an AI, we calculate it.
         if player.is_human:
              # In this architecture, human moves are applied directly in UI
              # This node is a pass-through or AI generator
              return {}
         else:
-             move = player.get_move(state['board'], valid_moves)
+             move = player.get_move(self.game_logic.board, valid_moves)
              self.game_logic.apply_move(move[0], move[1])
              return {
-                 "board": self.game_logic.board,
-                 "logs": [f"{player.name} moved {move}"]
+                 "board_hash": self.game_logic.hash,
+                 "last_move": (move[0], move[1]),
+                 "logs": [_move_log(player, move)]
              }
 
-    def run_turn(self, current_board, current_player_idx, turn_count):
-        initial = {
-            "board": current_board,
+    async def aagent_node(self, state: GameState):
+        p_idx = state['current_player_idx']
+        player = self.players[p_idx]
+
+        valid_moves = self.game_logic.get_valid_moves(player.player_id)
+
+        if not valid_moves:
+            return {"logs": [f"{player.name} stuck!"]}
+        if player.is_human:
+            return {}
+
+        move = await self._aget_move(player, dict(self.game_logic.board), valid_moves)
+        self.game_logic.apply_move(move[0], move[1])
+        return {
+            "board_hash": self.game_logic.hash,
+            "last_move": (move[0], move[1]),
+            "logs": [_move_log(player, move)]
+        }
+
+    async def _aget_move(self, player, board, valid_moves, speculative=None):
+        if speculative is not None:
+            return await player.aget_move(board, valid_moves, speculative=speculative)
+        if hasattr(player, "aget_move"):
+            return await player.aget_move(board, valid_moves)
+        # Local engines are CPU-bound; keep them off the event loop
+        return await asyncio.to_thread(player.get_move, board, valid_moves)
+
+    def _initial(self, current_board, current_player_idx, turn_count):
+        # No-op when current_board is already this game's board view
+        self.game_logic.board = current_board
+        return {
+            "game_id": self.game_id,
+            "board_hash": self.game_logic.hash,
             "current_player_idx": current_player_idx,
-            "players": self.players,
             "turn_count": turn_count,
-            "last_move": "",
+            "last_move": None,
             "logs": []
         }
-        return self.app.invoke(initial)
\ No newline at end of file
+
+    def _result(self, state):
+        return {**state, "board": self.game_logic.board}
+
+    def run_turn(self, current_board, current_player_idx, turn_count):
+        return self._result(self.app.invoke(self._initial(current_board, current_player_idx, turn_count)))
+
+    async def arun_turn(self, current_board, current_player_idx, turn_count):
+        return self._result(await self.app.ainvoke(self._initial(current_board, current_player_idx, turn_count)))
+
+    async def arun_round(self, current_board, start_idx, turn_count, on_move=None):
+        """Play AI turns from start_idx until a human is up or every player moved once.
+
+        LLM players (anything with speculate) have their requests sent up
+        front on the round's starting board. When a player's turn comes, the
+        speculative request is handed to its aget_move if its valid-move list
+        - and therefore its prompt - is unchanged by the moves played since;
+        otherwise it is cancelled. Book, cache and tier bookkeeping always run
+        on the real position, so discarded speculation is never counted as a
+        decision. on_move(result) (sync or async) runs after each move so
+        the caller can render while later requests are still in flight.
+        """
+        game = self.game_logic
+        game.board = current_board
+        n = len(self.players)
+        order = [(start_idx + k) % n for k in range(n)]
+
+        # Speculative prefetch on the starting position
+        pending = {}
+        snapshot = dict(game.board)
+        for idx in order:
+            player = self.players[idx]
+            if player.is_human:
+                break
+            if not hasattr(player, "speculate"):
+                continue
+            moves = game.get_valid_moves(player.player_id)
+            if moves:
+                pending[idx] = (player.speculate(snapshot, moves), moves)
+
+        results = []
+        try:
+            for k, idx in enumerate(order):
+                player = self.players[idx]
+                if player.is_human:
+                    break
+                moves = game.get_valid_moves(player.player_id)
+                task, spec_moves = pending.pop(idx, (None, None))
+                if not moves:
+                    if task is not None:
+                        task.cancel()
+                    result = {"board": game.board, "last_move": None, "logs": [f"{player.name} stuck!"],
+                              "player_idx": idx, "turn": turn_count + k, "speculative": False}
+                else:
+                    hit = task is not None and spec_moves == moves
+                    if task is not None and not hit:
+                        task.cancel()
+                    move = await self._aget_move(player, dict(game.board), moves,
+                                                 speculative=task if hit else None)
+                    game.apply_move(move[0], move[1])
+                    result = {"board": game.board, "last_move": (move[0], move[1]),
+                              "logs": [_move_log(player, move)],
+                              "player_idx": idx, "turn": turn_count + k, "speculative": hit}
+                results.append(result)
+                if on_move is not None:
+                    ret = on_move(result)
+                    if inspect.isawaitable(ret):
+                        await ret
+                if game.check_winner():
+                    break
+        finally:
+            for task, _ in pending.values():
+                task.cancel()
+        return results
@@ -1,113 +1,363 @@
+import random
+from collections import deque
+from collections.abc import MutableMapping
+
+# Axial directions (q, r)
+DIRECTIONS = [(1, 0), (1, -1), (0, -1),
+              (-1, 0), (-1, 1), (0, 1)]
+
+# Which corner triangles each player starts in, per player count
+HOME_TRIANGLES = {
+    2: {1: 0, 2: 3},
+    3: {1: 0, 2: 2, 3: 4},
+}
+for _count in (4, 5, 6):
+    HOME_TRIANGLES[_count] = {pid: pid - 1 for pid in range(1, 7)}
+
+
+def _build_layout():
+    """Star board geometry: ordered cell list plus the 6 corner triangles (axial)."""
+    cells = []
+    seen = set()
+
+    def add(pos):
+        if pos not in seen:
+            seen.add(pos)
+            cells.append(pos)
+
+    # Cube directions (pointy top hex)
+    cube_dirs = [
+        (1, -1, 0),
+        (1, 0, -1),
+        (0, 1, -1),
+        (-1, 1, 0),
+        (-1, 0, 1),
+        (0, -1, 1)
+    ]
+
+    # === 1) CENTER HEX (radius 4) ===
+    for x in range(-4, 5):
+        for y in range(-4, 5):
+            z = -x - y
+            if max(abs(x), abs(y), abs(z)) <= 4:
+                add((x, z))  # convert cube to axial (q=x, r=z)
+
+    # === 2) 6 CORNER TRIANGLES ===
+    triangles = []
+    for d in range(6):
+        dx, dy, dz = cube_dirs[d]
+        dx2, dy2, dz2 = cube_dirs[(d + 1) % 6]  # next direction clockwise
+
+        # apex distance MUST be 7
+        apex = (dx * 7, dy * 7, dz * 7)
+
+        tri = []
+        for i in range(5):
+            for j in range(5 - i):
+                if i == 4 and j > 0:  # only apex row is single point
+                    continue
+                x = apex[0] - i * dx - j * dx2
+                z = apex[2] - i * dz - j * dz2
+                tri.append((x, z))
+                add((x, z))
+        triangles.append(tri)
+
+    return cells, triangles
+
+
+# === Precomputed tables (built once at import) ===
+CELLS, _TRIANGLE_CELLS = _build_layout()
+NUM_CELLS = len(CELLS)
+CELL_ID = {pos: i for i, pos in enumerate(CELLS)}
+TRIANGLES = [tuple(CELL_ID[pos] for pos in tri) for tri in _TRIANGLE_CELLS]
+
+# NEIGHBORS[c] -> ids of adjacent cells
+# JUMPS[c] -> (over, land) id pairs for every direction where both cells exist
+NEIGHBORS = []
+JUMPS = []
+for _q, _r in CELLS:
+    _steps, _jumps = [], []
+    for _dq, _dr in DIRECTIONS:
+        _over = CELL_ID.get((_q + _dq, _r + _dr))
+        if _over is None:
+            continue
+        _steps.append(_over)
+        _land = CELL_ID.get((_q + 2 * _dq, _r + 2 * _dr))
+        if _land is not None:
+            _jumps.append((_over, _land))
+    NEIGHBORS.append(tuple(_steps))
+    JUMPS.append(tuple(_jumps))
+NEIGHBORS = tuple(NEIGHBORS)
+JUMPS = tuple(JUMPS)
+
+
+def goal_triangle(player_count, player_id):
+    """Cell ids of the corner opposite the player's home triangle."""
+    return TRIANGLES[(HOME_TRIANGLES[player_count][player_id] + 3) % 6]
+
+
+# HOME_OWNER[count][c] / GOAL_OWNER[count][c] -> pid whose home / goal contains c (0 = none)
+HOME_OWNER = {}
+GOAL_OWNER = {}
+for _count, _homes in HOME_TRIANGLES.items():
+    _home, _goal = bytearray(NUM_CELLS), bytearray(NUM_CELLS)
+    for _pid, _tid in _homes.items():
+        for _c in TRIANGLES[_tid]:
+            _home[_c] = _pid
+        for _c in goal_triangle(_count, _pid):
+            _goal[_c] = _pid
+    HOME_OWNER[_count] = bytes(_home)
+    GOAL_OWNER[_count] = bytes(_goal)
+
+# Zobrist keys: ZOBRIST[c][pid] for occupancy (pid 0 = empty, key 0),
+# ZOBRIST_SIDE[pid] for side-to-move. Fixed seed so hashes are stable across runs.
+_zrng = random.Random(0x4E584D44)
+ZOBRIST = tuple((0,) + tuple(_zrng.getrandbits(64) for _ in range(6)) for _ in range(NUM_CELLS))
+ZOBRIST_SIDE = (0,) + tuple(_zrng.getrandbits(64) for _ in range(6))
+
+
+class BoardView(MutableMapping):
+    """Dict-style {(q, r): pid} view over a ChineseCheckers cell array."""
+    __slots__ = ("_game",)
+
+    def __init__(self, game):
+        self._game = game
+
+    def __getitem__(self, pos):
+        return self._game.cells[CELL_ID[pos]]
+
+    def __setitem__(self, pos, pid):
+        self._game.set_cell(CELL_ID[pos], pid)
+
+    def __delitem__(self, pos):
+        raise TypeError("board cells cannot be removed")
+
+    def __iter__(self):
+        return iter(CELLS)
+
+    def __len__(self):
+        return NUM_CELLS
+
+    def __contains__(self, pos):
+        return pos in CELL_ID
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class ChineseCheckers:
     def __init__(self, player_count=2):
         self.player_count = player_count
-        self.board = {}
+        self.cells = bytearray(NUM_CELLS)
+        self.pieces = {pid: [] for pid in range(1, 7)}
+        self._move_cache = {}
+        self.history = []  # undo stack: (pid, start, end, path, prev_side, prev_hash)
+        self.players = sorted(HOME_TRIANGLES[player_count])
+        self.to_move = self.players[0]
+        self.hash = 0
+        self._home_owner = HOME_OWNER[player_count]
+        self._goal_owner = GOAL_OWNER[player_count]
+        self.goal_size = len(TRIANGLES[0])
+        # Per-player counters kept in sync by set_cell (index = pid)
+        self.in_goal = [0] * 7      # own pieces inside the goal triangle
+        self.goal_filled = [0] * 7  # any pieces inside the goal triangle
+        self.in_home = [0] * 7      # own pieces still inside the home triangle
+        self._view = BoardView(self)
         self.init_board()
 
     def init_board(self):
-        self.board = {}
+        self.cells = bytearray(NUM_CELLS)
+        self.pieces = {pid: [] for pid in range(1, 7)}
+        self._move_cache = {}
+        self.history = []
 
-        # Cube directions (pointy top hex)
-        cube_dirs = [
-            (1, -1, 0),
-            (1, 0, -1),
-            (0, 1, -1),
-            (-1, 1, 0),
-            (-1, 0, 1),
-            (0, -1, 1)
-        ]
+        # === ASSIGN PLAYERS ===
+        for pid, tid in HOME_TRIANGLES[self.player_count].items():
+            for c in TRIANGLES[tid]:
+                self.cells[c] = pid
+                self.pieces[pid].append(c)
 
-        # === 1) CENTER HEX (radius 4) ===
-        center = []
-        for x in range(-4, 5):
-            for y in range(-4, 5):
-                z = -x - y
-                if max(abs(x), abs(y), abs(z)) <= 4:
-                    center.append((x, y, z))
+        self.to_move = self.players[0]
+        self.hash = self.compute_hash()
+        self._recount()
 
-        # convert cube to axial (q=x, r=z)
-        for (x, y, z) in center:
-            self.board[(x, z)] = 0
+    # === Board Adapter ===
+    @property
+    def board(self):
+        return self._view
 
-        # === 2) 6 CORNER TRIANGLES (correct shape!) ===
-        corner_triangles = []
+    @board.setter
+    def board(self, mapping):
+        if isinstance(mapping, BoardView) and mapping._game is self:
+            return
+        self.cells = bytearray(NUM_CELLS)
+        self.pieces = {pid: [] for pid in range(1, 7)}
+        self._move_cache = {}
+        self.history = []
+        for pos, pid in mapping.items():
+            if pid:
+                c = CELL_ID[pos]
+                self.cells[c] = pid
+                self.pieces[pid].append(c)
+        self.hash = self.compute_hash()
+        self._recount()
 
-        for d in range(6):
-            dx, dy, dz = cube_dirs[d]
-            dx2, dy2, dz2 = cube_dirs[(d + 1) % 6]  # next direction clockwise
+    def _recount(self):
+        self.in_goal = [0] * 7
+        self.goal_filled = [0] * 7
+        self.in_home = [0] * 7
+        for c, pid in enumerate(self.cells):
+            if pid:
+                self._count(c, pid, 1)
 
-            # apex distance MUST be 6
-            apex = (dx * 7, dy * 7, dz * 7)
+    def _count(self, c, pid, delta):
+        owner = self._goal_owner[c]
+        if owner:
+            self.goal_filled[owner] += delta
+            if owner == pid:
+                self.in_goal[pid] += delta
+        if self._home_owner[c] == pid:
+            self.in_home[pid] += delta
 
+    # === Hashing ===
+    def compute_hash(self):
+        h = ZOBRIST_SIDE[self.to_move]
+        for c, pid in enumerate(self.cells):
+            h ^= ZOBRIST[c][pid]
+        return h
 
-            tri = []
+    def next_player(self, pid):
+        players = self.players
+        return players[(players.index(pid) + 1) % len(players)]
 
-            # rows: 4 + 3 + 2 + 1 = 10
-            for i in range(5):
-                for j in range(5 - i):
-                    # but ignore center-most 5 positions
-                    if i == 4:  # only apex row is single point
-                        if j > 0:
-                            continue
-                    x = apex[0] - i * dx - j * dx2
-                    y = apex[1] - i * dy - j * dy2
-                    z = apex[2] - i * dz - j * dz2
+    def set_cell(self, c, pid):
+        old = self.cells[c]
+        if old == pid:
+            return
+        self._invalidate(c)
+        if old:
+            self.pieces[old].remove(c)
+            self._count(c, old, -1)
+        if pid:
+            self.pieces[pid].append(c)
+            self._count(c, pid, 1)
+        self.cells[c] = pid
+        self.hash ^= ZOBRIST[c][old] ^ ZOBRIST[c][pid]
 
-                    tri.append((x, y, z))
-                    self.board[(x, z)] = 0  # axial coords
-
-            corner_triangles.append(tri)
+    # === Move Logic ===
+    def _invalidate(self, c):
+        # Drop cached move lists whose search read cell c
+        cache = self._move_cache
+        stale = [p for p, (_, touched) in cache.items() if c in touched]
+        for p in stale:
+            del cache[p]
 
-        # === 3) ASSIGN PLAYERS ===
-        final = {pos: 0 for pos in self.board}
+    def _search_piece(self, c):
+        """Steps plus BFS over jump chains from cell c.
 
-        if self.player_count == 2:
-            assign = {1: [0], 2: [3]}
+        Returns ([(dest, path)], touched) where path is the tuple of cell ids
+        visited (start first) and touched is every cell the search read.
+        """
+        cells = self.cells
+        dests = {}
+        touched = {c}
 
-        elif self.player_count == 3:
-            assign = {1: [0], 2: [2], 3: [4]}
+        # step
+        for n in NEIGHBORS[c]:
+            touched.add(n)
+            if cells[n] == 0:
+                dests[n] = (c, n)
 
-        else:
-            assign = {pid: [pid - 1] for pid in range(1, 7)}
+        # jump chains (the moving piece has left c, so never jump over it)
+        parent = {c: None}
+        queue = deque([c])
+        while queue:
+            cur = queue.popleft()
+            for over, land in JUMPS[cur]:
+                touched.add(over)
+                touched.add(land)
+                if land in parent or over == c or cells[over] == 0 or cells[land] != 0:
+                    continue
+                parent[land] = cur
+                queue.append(land)
+                if land not in dests:
+                    path = [land]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    dests[land] = tuple(reversed(path))
 
-        for pid, tri_ids in assign.items():
-            for tid in tri_ids:
-                for (x, y, z) in corner_triangles[tid]:
-                    final[(x, z)] = pid
+        return list(dests.items()), touched
 
-        self.board = final
+    def get_piece_moves(self, c):
+        entry = self._move_cache.get(c)
+        if entry is None:
+            entry = self._move_cache[c] = self._search_piece(c)
+        return entry[0]
 
-    # === Move Logic ===
     def get_valid_moves(self, player_id):
         moves = []
-        pieces = [pos for pos, pid in self.board.items() if pid == player_id]
-        directions = [(1, 0), (1, -1), (0, -1),
-                      (-1, 0), (-1, 1), (0, 1)]
-
-        for q, r in pieces:
-            # step
-            for dq, dr in directions:
-                nq, nr = q + dq, r + dr
-                if (nq, nr) in self.board and self.board[(nq, nr)] == 0:
-                    moves.append(((q, r), (nq, nr)))
-
-            # jump
-            for dq, dr in directions:
-                aq, ar = q + dq, r + dr
-                jq, jr = q + 2 * dq, r + 2 * dr
-                if (aq, ar) in self.board and self.board[(aq, ar)] != 0:
-                    if (jq, jr) in self.board and self.board[(jq, jr)] == 0:
-                        moves.append(((q, r), (jq, jr)))
-
+        for c in self.pieces[player_id]:
+            start = CELLS[c]
+            for dest, _ in self.get_piece_moves(c):
+                moves.append((start, CELLS[dest]))
         return moves
 
-    def apply_move(self, start, end):
-        if self.board[start] == 0:
+    def get_move_path(self, start, end):
+        """Cells visited by the (chain) move start -> end, or None if illegal."""
+        s, e = CELL_ID[start], CELL_ID[end]
+        if self.cells[s] == 0:
+            return None
+        for dest, path in self.get_piece_moves(s):
+            if dest == e:
+                return [CELLS[c] for c in path]
+        return None
+
+    # === Make / Unmake ===
+    def make(self, s, e, path=None):
+        """Move the piece on cell s to cell e and push an undo record."""
+        p = self.cells[s]
+        if p == 0:
             return False
-        p = self.board[start]
-        self.board[start] = 0
-        self.board[end] = p
+        prev_side, prev_hash = self.to_move, self.hash
+        self.set_cell(s, 0)
+        self.set_cell(e, p)
+        self.to_move = self.next_player(p)
+        self.hash ^= ZOBRIST_SIDE[prev_side] ^ ZOBRIST_SIDE[self.to_move]
+        self.history.append((p, s, e, path, prev_side, prev_hash))
         return True
 
+    def unmake(self):
+        """Pop the last move and restore the board; returns its undo record."""
+        record = self.history.pop()
+        p, s, e, _, prev_side, prev_hash = record
+        self.set_cell(e, 0)
+        self.set_cell(s, p)
+        self.to_move = prev_side
+        self.hash = prev_hash
+        return record
+
+    def make_move(self, start, end, path=None):
+        return self.make(CELL_ID[start], CELL_ID[end], path)
+
+    def unmake_move(self):
+        record = self.unmake()
+        return CELLS[record[1]], CELLS[record[2]]
+
+    def apply_move(self, start, end):
+        return self.make_move(start, end)
+
     def check_winner(self):
+        """Winning player id, or 0.
+
+        A player wins once their goal triangle is full of their own pieces.
+        Blocking rule: opponent pieces squatting in the goal cannot stop a
+        player who has left home entirely - a full goal with at least one
+        own piece also wins.
+        """
+        size = self.goal_size
+        for pid in self.players:
+            if self.in_goal[pid] == size:
+                return pid
+            if self.goal_filled[pid] == size and self.in_goal[pid] and not self.in_home[pid]:
+                return pid
         return 0
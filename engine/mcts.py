@@ -0,0 +1,217 @@
+import math
+import random
+import threading
+import time
+
+from engine.distance import GOAL_DIST_LIST
+from engine.logic import ChineseCheckers, CELLS
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "value", "mover", "hash")
+
+    def __init__(self, move, parent, mover, h):
+        self.move = move          # (start, end) cell ids that led here
+        self.parent = parent
+        self.children = []
+        self.untried = None       # generated on first visit
+        self.visits = 0
+        self.value = 0.0          # summed reward for `mover`
+        self.mover = mover        # player who made `move`
+        self.hash = h
+
+
+def evaluate(game):
+    """Per-player reward in [0, 1] from total goal distance (lower is better)."""
+    dist = GOAL_DIST_LIST[game.player_count]
+    totals = {pid: sum(dist[pid][c] for c in game.pieces[pid]) for pid in game.players}
+    scale = 4.0 * max(len(game.pieces[pid]) for pid in game.players)
+    rewards = {}
+    for pid, own in totals.items():
+        others = [t for p, t in totals.items() if p != pid]
+        edge = sum(others) / len(others) - own
+        rewards[pid] = min(1.0, max(0.0, 0.5 + edge / (2 * scale)))
+    return rewards
+
+
+def _ordered_moves(game, pid):
+    """All (start, end, path) for pid, worst first so list.pop() yields the best."""
+    dist = GOAL_DIST_LIST[game.player_count][pid]
+    moves = []
+    for s in game.pieces[pid]:
+        for e, path in game.get_piece_moves(s):
+            moves.append((dist[s] - dist[e], s, e, path))
+    moves.sort(key=lambda m: m[0])
+    return [(s, e, path) for _, s, e, path in moves]
+
+
+def _rollout_move(game, pid, rng, epsilon):
+    dist = GOAL_DIST_LIST[game.player_count][pid]
+    best, best_gain, n = None, None, 0
+    for s in game.pieces[pid]:
+        for e, path in game.get_piece_moves(s):
+            n += 1
+            gain = dist[s] - dist[e] + rng.random() * 0.5
+            if best_gain is None or gain > best_gain:
+                best, best_gain = (s, e, path), gain
+    if n and rng.random() < epsilon:
+        pieces = [s for s in game.pieces[pid] if game.get_piece_moves(s)]
+        s = rng.choice(pieces)
+        e, path = rng.choice(game.get_piece_moves(s))
+        return s, e, path
+    return best
+
+
+class MCTS:
+    """Single-process UCT over a ChineseCheckers position using make/unmake."""
+
+    def __init__(self, game, exploration=1.0, rollout_depth=None, epsilon=0.2, rng=None):
+        self.game = game
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth or 2 * len(game.players)
+        self.epsilon = epsilon
+        self.rng = rng or random.Random()
+        self.root = None
+
+    def set_root(self, previous=None):
+        """Start from the current position, reusing a matching subtree of `previous`."""
+        game = self.game
+        root = _find_subtree(previous, game.hash, max_depth=len(game.players)) if previous else None
+        if root is None:
+            root = Node(None, None, _previous_player(game), game.hash)
+        root.parent = None
+        self.root = root
+        return root
+
+    def search(self, playouts=None, time_limit=None):
+        if self.root is None or self.root.hash != self.game.hash:
+            self.set_root()
+        deadline = time.perf_counter() + time_limit if time_limit else None
+        done = 0
+        while True:
+            if playouts is not None and done >= playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if playouts is None and deadline is None:
+                break
+            self._playout()
+            done += 1
+        return done
+
+    def _playout(self):
+        game = self.game
+        node = self.root
+        made = 0
+
+        # Selection
+        while True:
+            if game.check_winner():
+                break
+            if node.untried is None:
+                node.untried = _ordered_moves(game, game.to_move)
+            if node.untried or not node.children:
+                break
+            node = self._select(node)
+            game.make(node.move[0], node.move[1], node.move[2])
+            made += 1
+
+        # Expansion
+        if node.untried and not game.check_winner():
+            s, e, path = node.untried.pop()
+            mover = game.to_move
+            game.make(s, e, path)
+            made += 1
+            child = Node((s, e, path), node, mover, game.hash)
+            node.children.append(child)
+            node = child
+
+        # Rollout
+        rolled = 0
+        winner = game.check_winner()
+        while not winner and rolled < self.rollout_depth:
+            move = _rollout_move(game, game.to_move, self.rng, self.epsilon)
+            if move is None:
+                break
+            game.make(*move)
+            rolled += 1
+            winner = game.check_winner()
+        if winner:
+            rewards = {pid: 1.0 if pid == winner else 0.0 for pid in game.players}
+        else:
+            rewards = evaluate(game)
+        for _ in range(rolled + made):
+            game.unmake()
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            node.value += rewards.get(node.mover, 0.0)
+            node = node.parent
+
+    def _select(self, node):
+        log_n = math.log(node.visits or 1)
+        c = self.exploration
+        return max(
+            node.children,
+            key=lambda ch: ch.value / ch.visits + c * math.sqrt(log_n / ch.visits),
+        )
+
+    def root_stats(self):
+        """{(start, end): (visits, value)} over the root's children."""
+        return {(ch.move[0], ch.move[1]): (ch.visits, ch.value) for ch in self.root.children}
+
+
+def _previous_player(game):
+    players = game.players
+    return players[(players.index(game.to_move) - 1) % len(players)]
+
+
+def _find_subtree(node, h, max_depth):
+    frontier = [node]
+    for _ in range(max_depth + 1):
+        nxt = []
+        for n in frontier:
+            if n.hash == h:
+                return n
+            nxt.extend(n.children)
+        frontier = nxt
+    return None
+
+
+# === Process pool entry point ===
+# Each worker keeps the tree from its caller's last search so the next turn
+# can reuse it. Trees are keyed by caller: players sharing a process (arena
+# --threads, in-process search) must never walk or grow the same nodes.
+_WORKER_ROOTS = {}
+_WORKER_ROOTS_LOCK = threading.Lock()
+
+
+def search_worker(cells, player_count, to_move, playouts, time_limit, seed, exploration=1.0, tree=None):
+    """One search from the given position; returns (playouts, root stats).
+
+    `tree` names the caller whose previous tree may be reused (None = no reuse).
+    """
+    if playouts is None and not time_limit:
+        raise ValueError("MCTS search needs playouts or a time_limit")
+    game = ChineseCheckers(player_count)
+    game.board = {CELLS[c]: pid for c, pid in enumerate(cells)}
+    game.to_move = to_move
+    game.hash = game.compute_hash()
+
+    # Taken out while searching, so a concurrent search under the same key starts fresh
+    with _WORKER_ROOTS_LOCK:
+        previous = _WORKER_ROOTS.pop(tree, None) if tree is not None else None
+    mcts = MCTS(game, exploration=exploration, rng=random.Random(seed))
+    mcts.set_root(previous)
+    n = mcts.search(playouts=playouts, time_limit=time_limit)
+    if tree is not None:
+        with _WORKER_ROOTS_LOCK:
+            _WORKER_ROOTS[tree] = mcts.root
+    return n, mcts.root_stats()
+
+
+def drop_tree(tree):
+    """Forget the tree kept for `tree` in this process."""
+    with _WORKER_ROOTS_LOCK:
+        _WORKER_ROOTS.pop(tree, None)
@@ -0,0 +1,144 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans cached lookups (~µs) up to slow LLM round trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus layout) with bucket-interpolated quantiles."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class MetricsRegistry:
+    """In-process counters and histograms keyed by (name, labels).
+
+    Exports to Prometheus text format or JSONL; nothing here needs a
+    network or a metrics server.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self):
+        """{name{labels}: {count, mean, p50, p99, max}} for every histogram."""
+        out = {}
+        with self._lock:
+            for (name, labels), h in sorted(self.histograms.items()):
+                out[_series(name, labels)] = {
+                    "count": h.count,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                    "max": h.max,
+                }
+        return out
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{_series(name, labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(_bucket_labels(h), h.counts):
+                    cumulative += n
+                    lines.append(f"{_series(name + '_bucket', labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{_series(name + '_sum', labels)} {h.sum:.6f}")
+                lines.append(f"{_series(name + '_count', labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        stamp = time.time()
+        rows = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                rows.append({"ts": stamp, "type": "counter", "name": name, "labels": dict(labels), "value": value})
+        for series, stats in self.summary().items():
+            name, _, _ = series.partition("{")
+            rows.append({"ts": stamp, "type": "histogram", "series": series, "name": name, **stats})
+        return "".join(json.dumps(row) + "\n" for row in rows)
+
+    def write(self, path):
+        """Append JSONL to *.jsonl paths, otherwise overwrite with Prometheus text."""
+        if path.endswith(".jsonl"):
+            with open(path, "a") as f:
+                f.write(self.to_jsonl())
+        else:
+            with open(path, "w") as f:
+                f.write(self.to_prometheus())
+
+
+def _bucket_labels(hist):
+    return [repr(b) for b in hist.bounds] + ["+Inf"]
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+# Process-wide registry used by the graphs and players
+METRICS = MetricsRegistry()
@@ -0,0 +1,272 @@
+"""Compact binary game records (.hxr) and an mmap-backed archive reader.
+
+A file is a sequence of games. Each game is a 64-byte header, its player
+specs as JSON (padded to a 32-byte boundary), then one fixed-width
+32-byte record per move:
+
+    header  magic "HXR1", version, player_count, winner, seed,
+            move_count (0xFFFFFFFF while the game is being written),
+            specs length, start timestamp
+    move    player, start cell id, end cell id, tier code, path length,
+            up to MAX_PATH path cell ids, decision time (float32)
+
+Cell ids are engine.logic cell indices. Paths longer than MAX_PATH keep
+their length but not their cells; GameRecord.path() recomputes those.
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from engine.logic import ChineseCheckers, CELLS, CELL_ID
+
+MAGIC = b"HXR1"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxQIId32x")
+assert HEADER.size == 64
+UNFINISHED = 0xFFFFFFFF
+ALIGN = 32
+MAX_PATH = 23
+
+MOVE_DTYPE = np.dtype([
+    ("player", "u1"),
+    ("start", "u1"),
+    ("end", "u1"),
+    ("tier", "u1"),
+    ("path_len", "u1"),
+    ("path", "u1", (MAX_PATH,)),
+    ("time", "<f4"),
+])
+assert MOVE_DTYPE.itemsize == 32
+
+# Decision tiers (AIPlayer.last_tier); 0 = not reported
+TIERS = ("", "cache", "llm", "engine", "random", "book")
+TIER_CODE = {name: code for code, name in enumerate(TIERS)}
+
+
+def _padded(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+class GameRecordWriter:
+    """Appends games to one .hxr file; one game in progress at a time.
+
+    Each move is written as it is played, so a crashed game still leaves
+    its moves behind (readers treat an unfinished game as running to EOF).
+    Reopening such a file first finalizes that game, so appended games are
+    not read as more of its moves.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.f = open(path, "r+b" if os.path.exists(path) else "w+b")
+        self._recover()
+        self._header_at = None
+        self._header = None
+        self.moves = 0
+
+    def _recover(self):
+        """Seek to the append position, closing out a game left unfinished by a crash."""
+        f = self.f
+        size = f.seek(0, os.SEEK_END)
+        pos = 0
+        while pos + HEADER.size <= size:
+            f.seek(pos)
+            header = list(HEADER.unpack(f.read(HEADER.size)))
+            if header[0] != MAGIC or header[1] != VERSION:
+                raise ValueError(f"{self.path}: not a game record at offset {pos}")
+            start = pos + HEADER.size + _padded(header[6])
+            if header[5] == UNFINISHED:
+                if start > size:
+                    # Crashed while writing its specs: drop the game
+                    f.truncate(pos)
+                    break
+                # Keep its whole move records, drop a torn trailing one
+                header[5] = (size - start) // MOVE_DTYPE.itemsize
+                f.seek(pos)
+                f.write(HEADER.pack(*header))
+                f.truncate(start + header[5] * MOVE_DTYPE.itemsize)
+                break
+            pos = start + header[5] * MOVE_DTYPE.itemsize
+        else:
+            if pos < size:
+                # Torn header from a crash inside begin_game()
+                f.truncate(pos)
+        f.flush()
+        f.seek(0, os.SEEK_END)
+
+    def begin_game(self, specs, seed, player_count):
+        if self._header_at is not None:
+            raise RuntimeError("previous game not finished; call end_game() first")
+        blob = json.dumps(list(specs)).encode()
+        self._header_at = self.f.tell()
+        self._header = [MAGIC, VERSION, player_count, 0, seed & (2**64 - 1), UNFINISHED, len(blob), time.time()]
+        self.f.write(HEADER.pack(*self._header))
+        self.f.write(blob.ljust(_padded(len(blob)), b"\0"))
+        self.moves = 0
+
+    def add_move(self, player_id, start, end, path=None, decision_time=0.0, tier=None):
+        """start/end are board coordinates; path a list of coordinates (start..end)."""
+        rec = np.zeros(1, dtype=MOVE_DTYPE)
+        rec["player"] = player_id
+        rec["start"] = CELL_ID[start]
+        rec["end"] = CELL_ID[end]
+        rec["tier"] = TIER_CODE.get(tier or "", 0)
+        if path:
+            ids = [CELL_ID[pos] for pos in path]
+            rec["path_len"] = len(ids)
+            rec["path"][0, :min(len(ids), MAX_PATH)] = ids[:MAX_PATH]
+        rec["time"] = decision_time
+        self.f.write(rec.tobytes())
+        self.moves += 1
+
+    def end_game(self, winner=0):
+        header = self._header
+        header[3] = winner
+        header[5] = self.moves
+        end = self.f.tell()
+        self.f.seek(self._header_at)
+        self.f.write(HEADER.pack(*header))
+        self.f.seek(end)
+        self.f.flush()
+        self._header_at = None
+
+    def close(self):
+        if self._header_at is not None:
+            self.end_game()
+        self.f.close()
+
+
+class GameRecord:
+    """One game inside an archive; `moves` is a zero-copy view into the mmap."""
+
+    def __init__(self, specs, seed, player_count, winner, started, moves):
+        self.specs = specs
+        self.seed = seed
+        self.player_count = player_count
+        self.winner = winner
+        self.started = started
+        self.moves = moves
+
+    def __len__(self):
+        return len(self.moves)
+
+    def move(self, ply):
+        rec = self.moves[ply]
+        return CELLS[rec["start"]], CELLS[rec["end"]]
+
+    def tier(self, ply):
+        return TIERS[self.moves[ply]["tier"]]
+
+    def path(self, ply, game=None):
+        """Coordinates visited by move `ply`; pass the position before it to recompute long paths."""
+        rec = self.moves[ply]
+        n = int(rec["path_len"])
+        if n <= MAX_PATH:
+            return [CELLS[c] for c in rec["path"][:n]] or None
+        if game is None:
+            game = self.position(ply)
+        return game.get_move_path(*self.move(ply))
+
+    def position(self, ply=None):
+        """Board after the first `ply` moves (all of them by default)."""
+        game = ChineseCheckers(self.player_count)
+        moves = self.moves if ply is None else self.moves[:ply]
+        for start, end in zip(moves["start"].tolist(), moves["end"].tolist()):
+            game.make(start, end)
+        return game
+
+    def replay(self):
+        """Yield (ply, (start, end), game) with game showing the position after each move."""
+        game = ChineseCheckers(self.player_count)
+        for ply, (start, end) in enumerate(zip(self.moves["start"].tolist(), self.moves["end"].tolist())):
+            game.make(start, end)
+            yield ply, (CELLS[start], CELLS[end]), game
+
+
+class RecordArchive:
+    """Memory-maps every .hxr file under a directory (or a single file).
+
+    Only the game headers are read up front; move data stays in the page
+    cache until a game is accessed, so indexing millions of games is cheap.
+    """
+
+    def __init__(self, path):
+        files = sorted(glob.glob(os.path.join(path, "*.hxr"))) if os.path.isdir(path) else [path]
+        self._maps = []
+        self.files = []
+        self.index = []  # (map idx, header offset, moves offset, move count)
+        for name in files:
+            if os.path.getsize(name) == 0:
+                continue
+            with open(name, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            self.files.append(name)
+            self._scan(len(self._maps) - 1, mm)
+
+    def _scan(self, m, mm):
+        pos, size = 0, len(mm)
+        while pos + HEADER.size <= size:
+            magic, version, _, _, _, count, specs_len, _ = HEADER.unpack_from(mm, pos)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a game record at offset {pos}")
+            start = pos + HEADER.size + _padded(specs_len)
+            if count == UNFINISHED:
+                # Interrupted writer: every whole move record up to EOF
+                count = (size - start) // MOVE_DTYPE.itemsize
+            self.index.append((m, pos, start, count))
+            pos = start + count * MOVE_DTYPE.itemsize
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        m, pos, start, count = self.index[i]
+        mm = self._maps[m]
+        _, _, player_count, winner, seed, _, specs_len, started = HEADER.unpack_from(mm, pos)
+        specs = json.loads(bytes(mm[pos + HEADER.size:pos + HEADER.size + specs_len]))
+        moves = np.frombuffer(mm, dtype=MOVE_DTYPE, count=count, offset=start)
+        return GameRecord(specs, seed, player_count, winner, started, moves)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def key(self, i):
+        """Stable id for game i: '<file name>@<header offset>'."""
+        m, pos, _, _ = self.index[i]
+        return f"{os.path.basename(self.files[m])}@{pos}"
+
+    def total_moves(self):
+        return sum(entry[3] for entry in self.index)
+
+    def close(self):
+        # Views handed out by __getitem__ keep their map alive until released
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                pass
+        self._maps = []
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(directory, prefix="games"):
+    """Writer private to this process and thread: <directory>/<prefix>-<pid>-<thread>.hxr"""
+    key = (os.path.abspath(directory), prefix, os.getpid(), threading.get_ident())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            name = f"{prefix}-{os.getpid()}-{threading.get_ident()}.hxr"
+            writer = _writers[key] = GameRecordWriter(os.path.join(directory, name))
+        return writer
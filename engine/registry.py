@@ -0,0 +1,49 @@
+import itertools
+import threading
+import weakref
+
+
+class Registry:
+    """Process-wide id -> object table for state that stays out of graph channels.
+
+    Graph state carries only the id; nodes resolve the live object here.
+    Entries are weak, so a game or run context disappears with its owner.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._items = weakref.WeakValueDictionary()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def register(self, obj):
+        with self._lock:
+            key = f"{self.prefix}-{next(self._ids)}"
+            self._items[key] = obj
+        return key
+
+    def get(self, key):
+        obj = self._items.get(key)
+        if obj is None:
+            raise KeyError(f"{key} is not registered (released or never created)")
+        return obj
+
+    def release(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compiled_graph(name, build):
+    """Compile the graph `build()` returns once per process and share it."""
+    with _compiled_lock:
+        app = _compiled.get(name)
+        if app is None:
+            app = _compiled[name] = build()
+        return app
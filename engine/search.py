@@ -0,0 +1,169 @@
+import time
+
+from engine.distance import GOAL_DIST_LIST
+from engine.transposition import TranspositionTable
+
+WIN_SCORE = 100000
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class AlphaBeta:
+    """Negamax alpha-beta with iterative deepening for 2-player games.
+
+    Scores are goal-distance differences from the side to move's point of
+    view. Move ordering: TT move, then killer moves, then history + distance gain.
+    """
+
+    def __init__(self, game, tt=None):
+        if len(game.players) != 2:
+            raise ValueError("AlphaBeta search only supports 2-player games")
+        self.game = game
+        self.tt = tt if tt is not None else TranspositionTable(1 << 18)
+        self.dist = GOAL_DIST_LIST[game.player_count]
+        self.killers = {}
+        self.history = {}
+        self.nodes = 0
+        self.deadline = None
+        self.root_scores = {}
+
+    def evaluate(self):
+        game = self.game
+        me = game.to_move
+        opp = game.next_player(me)
+        winner = game.check_winner()
+        if winner:
+            return WIN_SCORE if winner == me else -WIN_SCORE
+        d_me, d_opp = self.dist[me], self.dist[opp]
+        return sum(d_opp[c] for c in game.pieces[opp]) - sum(d_me[c] for c in game.pieces[me])
+
+    def search(self, time_limit=0.5, max_depth=32):
+        """Returns (best_move, stats); best_move is (start, end, path) in cell ids."""
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit else None
+        self.nodes = 0
+        self.killers = {}
+        # A table kept across turns: last turn's entries yield their slots first
+        self.tt.new_generation()
+        best, best_score, depth_done = None, 0, 0
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self._root(depth)
+            except SearchTimeout:
+                break
+            best, best_score, depth_done = move, score, depth
+            if move is None or abs(score) >= WIN_SCORE:
+                break
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "depth": depth_done,
+            "nodes": self.nodes,
+            "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+            "score": best_score,
+            "time": elapsed,
+        }
+        return best, stats
+
+    def _moves(self, ply, tt_move):
+        game = self.game
+        pid = game.to_move
+        dist = self.dist[pid]
+        killers = self.killers.get(ply, ())
+        history = self.history
+        scored = []
+        for s in game.pieces[pid]:
+            for e, path in game.get_piece_moves(s):
+                key = (s, e)
+                if key == tt_move:
+                    order = 1 << 30
+                elif key in killers:
+                    order = 1 << 20
+                else:
+                    order = history.get(key, 0) + (dist[s] - dist[e]) * 8
+                scored.append((order, s, e, path))
+        scored.sort(key=lambda m: m[0], reverse=True)
+        return scored
+
+    def _root(self, depth):
+        game = self.game
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        entry = self.tt.probe(game.hash)
+        tt_move = entry[1][2] if entry else None
+        best, best_score = None, -WIN_SCORE - 1
+        scores = {}
+        for _, s, e, path in self._moves(0, tt_move):
+            game.make(s, e, path)
+            try:
+                score = -self._negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                game.unmake()
+            scores[(s, e)] = score
+            if score > best_score:
+                best, best_score = (s, e, path), score
+            if score > alpha:
+                alpha = score
+        if best is not None:
+            self.tt.store(game.hash, (best_score, EXACT, best[:2]), depth)
+        self.root_scores = scores
+        return best_score, best
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 511 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+        game = self.game
+        if depth <= 0 or game.check_winner():
+            return self.evaluate()
+
+        alpha_orig = alpha
+        entry = self.tt.probe(game.hash)
+        tt_move = None
+        if entry is not None:
+            tt_depth, (tt_score, flag, tt_move) = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return tt_score
+                if flag == LOWER and tt_score > alpha:
+                    alpha = tt_score
+                elif flag == UPPER and tt_score < beta:
+                    beta = tt_score
+                if alpha >= beta:
+                    return tt_score
+
+        best_score, best_move = -WIN_SCORE - 1, None
+        moves = self._moves(ply, tt_move)
+        if not moves:
+            return self.evaluate()
+
+        for _, s, e, path in moves:
+            game.make(s, e, path)
+            try:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.unmake()
+            if score > best_score:
+                best_score, best_move = score, (s, e)
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                killers = self.killers.setdefault(ply, [])
+                if best_move not in killers:
+                    killers.insert(0, best_move)
+                    del killers[2:]
+                self.history[best_move] = self.history.get(best_move, 0) + depth * depth
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(game.hash, (best_score, flag, best_move), depth)
+        return best_score
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """Fixed-size position table keyed by ChineseCheckers.hash.
+
+    policy="depth": one slot per (hash & mask); a stored entry is only
+    replaced by a search of equal or greater depth, unless it is stale: not
+    stored or hit since the last new_generation(). Callers that keep a
+    table across searches bump the generation once per search, so deep
+    entries from old positions cannot hold their slots for good.
+    policy="lru": up to `size` entries, least recently used evicted first.
+    """
+
+    def __init__(self, size=1 << 16, policy="depth"):
+        if policy not in ("depth", "lru"):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.policy = policy
+        self.size = size
+        if policy == "depth":
+            # round up to a power of two so slots are a mask away
+            self.size = 1 << max(size - 1, 1).bit_length()
+            self.mask = self.size - 1
+            self.keys = [None] * self.size
+            self.slots = [None] * self.size
+            self.ages = [0] * self.size
+        else:
+            self.lru = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def probe(self, key):
+        """Returns (depth, value) for key, or None."""
+        if self.policy == "depth":
+            i = key & self.mask
+            if self.keys[i] == key:
+                self.hits += 1
+                self.ages[i] = self.generation
+                return self.slots[i]
+        else:
+            entry = self.lru.get(key)
+            if entry is not None:
+                self.lru.move_to_end(key)
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, value, depth=0):
+        if self.policy == "depth":
+            i = key & self.mask
+            old_key = self.keys[i]
+            if old_key is not None:
+                if self.slots[i][0] > depth and self.ages[i] == self.generation:
+                    return False
+                if old_key != key:
+                    self.evictions += 1
+            self.keys[i] = key
+            self.slots[i] = (depth, value)
+            self.ages[i] = self.generation
+        else:
+            lru = self.lru
+            if key in lru:
+                lru.move_to_end(key)
+            elif len(lru) >= self.size:
+                lru.popitem(last=False)
+                self.evictions += 1
+            lru[key] = (depth, value)
+        return True
+
+    def new_generation(self):
+        """Mark every current entry stale (still probed, but replaceable at any depth)."""
+        self.generation += 1
+
+    def clear(self):
+        if self.policy == "depth":
+            self.keys = [None] * self.size
+            self.slots = [None] * self.size
+            self.ages = [0] * self.size
+        else:
+            self.lru.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        if self.policy == "depth":
+            return self.size - self.keys.count(None)
+        return len(self.lru)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+            "generation": self.generation,
+        }
@@ -1,13 +1,26 @@
 import time
 import os
-from engine.logic import ChineseCheckers
+from engine.logic import ChineseCheckers, CELLS
 from agents.players import AIPlayer, HumanPlayer, Referee
+from engine.metrics import METRICS
+from engine.records import get_writer
 
 def clear_screen():
     """Clear terminal screen"""
     os.system('cls' if os.name == 'nt' else 'clear')
 
-def setup_player(player_id):
+def print_board(game):
+    """Text rendering of the star (the web board turned 90°): player ids, '.' for empty cells"""
+    cols = [2 * r + q for q, r in CELLS]
+    left = min(cols)
+    rows = {}
+    for (q, r), col, pid in zip(CELLS, cols, game.cells):
+        rows.setdefault(q, {})[col - left] = str(pid) if pid else "."
+    for q in sorted(rows):
+        line = rows[q]
+        print("".join(line.get(x, " ") for x in range(max(line) + 1)))
+
+def setup_player(player_id, player_count):
     """Configuration Menu for a single player slot"""
     print(f"\n--- Configuring Player {player_id} ---")
     while True:
@@ -32,10 +45,22 @@ def setup_player(player_id):
             }
             provider = model_map.get(choice, "groq")
             print(f"✅ Selected: {provider.upper()}")
-            return AIPlayer(player_id, model_provider=provider)
+            return AIPlayer(player_id, model_provider=provider, player_count=player_count)
         else:
             print("❌ Invalid choice. Please type 'H' or 'A'.")
 
+def print_metrics():
+    """Latency summary for the game; also exported to $HEXAMIND_METRICS if set."""
+    summary = METRICS.summary()
+    if summary:
+        print("\n📈 Latency (count / p50 / p99):")
+        for series, stats in summary.items():
+            print(f"  {series}: {stats['count']} / {stats['p50']:.3f}s / {stats['p99']:.3f}s")
+    path = os.getenv("HEXAMIND_METRICS")
+    if path:
+        METRICS.write(path)
+        print(f"📝 Metrics written to {path}")
+
 def main():
     clear_screen()
     print("=" * 60)
@@ -81,7 +106,7 @@ def main():
     for i in range(1, num_players + 1):
         pos_name = position_names.get(num_players, {}).get(i, f"Position {i}")
         print(f"\n📍 Player {i} starts at: {pos_name}")
-        p = setup_player(i)
+        p = setup_player(i, num_players)
         players.append(p)
     
     # Optional referee
@@ -95,11 +120,17 @@ def main():
     
     # Initial board display
     clear_screen()
-    game.visualize()
+    print_board(game)
     
     # 3. Game Loop
     turn = 1
     max_turns = 200  # Prevent infinite games
+
+    # Optional binary game record (see engine/records.py)
+    record_dir = os.getenv("HEXAMIND_RECORDS")
+    writer = get_writer(record_dir, "cli") if record_dir else None
+    if writer:
+        writer.begin_game([p.name for p in players], 0, num_players)
     
     while turn <= max_turns:
         # Check for winner
@@ -138,21 +169,28 @@ def main():
             
             if not current_agent.is_human:
                 elapsed = time.time() - start_time
-                print(f"⏱️  Decision time: {elapsed:.2f}s")
+                METRICS.observe("hexamind_turn_seconds", elapsed, graph="cli")
+                tier = getattr(current_agent, "last_tier", None)
+                print(f"⏱️  Decision time: {elapsed:.2f}s" + (f" ({tier})" if tier else ""))
         except Exception as e:
             print(f"❌ Error getting move: {e}")
             move = moves[0]  # Fallback to first valid move
         
         # Apply Move
         if move:
+            path = game.get_move_path(move[0], move[1]) if writer else None
             success = game.apply_move(move[0], move[1])
+            if success and writer:
+                elapsed = 0.0 if current_agent.is_human else time.time() - start_time
+                writer.add_move(current_agent.player_id, move[0], move[1], path, elapsed,
+                                getattr(current_agent, "last_tier", None))
             if success:
                 print(f"✅ Moved: {move[0]} → {move[1]}")
                 
                 # Visualize updated board
                 time.sleep(0.5)
                 clear_screen()
-                game.visualize()
+                print_board(game)
                 
                 # Commentary
                 if referee and (not current_agent.is_human or turn % 5 == 0):
@@ -171,6 +209,9 @@ def main():
         print("⏰ Game ended - Turn limit reached!")
         print(f"{'='*60}")
     
+    if writer:
+        writer.end_game(game.check_winner())
+        writer.close()
     print("\n🎮 Thanks for playing HEXAMIND ARENA! 🎮\n")
 
 if __name__ == "__main__":
@@ -181,4 +222,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+    finally:
+        # Interrupted games still report the turns they played
+        print_metrics()
\ No newline at end of file
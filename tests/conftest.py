@@ -0,0 +1,23 @@
+import pytest
+
+from agents.move_cache import MoveCache
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """No real API key, opening book or on-disk move cache from the user's machine."""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("HEXAMIND_BOOK", "")
+    monkeypatch.setenv("HEXAMIND_MOVE_CACHE", "")
+    return tmp_path
+
+
+@pytest.fixture
+def ai_player(offline):
+    from agents.players import AIPlayer
+
+    def make(player_id, player_count=2, **kwargs):
+        kwargs.setdefault("move_cache", MoveCache(None))
+        kwargs.setdefault("book", False)
+        return AIPlayer(player_id, player_count=player_count, **kwargs)
+    return make
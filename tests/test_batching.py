@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents.batching import BatchBroker, combine_prompts, split_answers
+from engine.logic import ChineseCheckers
+
+
+class _Reply:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {}
+
+
+class _StubLLM:
+    """Answers every position with its number; remembers what was sent."""
+
+    def __init__(self, reply=None):
+        self.sent = []
+        self.reply = reply
+        self.lock = threading.Lock()
+
+    def batch(self, batches, return_exceptions=False):
+        with self.lock:
+            self.sent.extend(messages[0].content for messages in batches)
+        return [_Reply(self.reply or "7") for _ in batches]
+
+    def invoke(self, messages, timeout=None):
+        with self.lock:
+            self.sent.append(messages[0].content)
+        return _Reply(self.reply or "1: 3\n2: 0")
+
+
+def test_multi_mode_splits_one_answer_per_position():
+    llm = _StubLLM()
+    broker = BatchBroker(llm, window=0.2)
+    futures = [broker.submit("a"), broker.submit("b")]
+    assert [f.result(5) for f in futures] == ["3", "0"]
+    assert llm.sent == [combine_prompts(["a", "b"])]
+    assert broker.stats()["batches"] == 1
+
+
+def test_expired_request_is_dropped_before_dispatch():
+    llm = _StubLLM()
+    broker = BatchBroker(llm, window=0.3)
+    late = broker.submit("late", timeout=0.05)
+    kept = broker.submit("kept")
+    assert kept.result(5) == "7"
+    with pytest.raises(TimeoutError):
+        late.result(0)
+    assert llm.sent == ["kept"]
+    assert broker.stats()["dropped"] == 1
+
+
+def test_cancelled_request_is_not_sent():
+    llm = _StubLLM()
+    broker = BatchBroker(llm, window=0.3)
+    gone = broker.submit("gone")
+    kept = broker.submit("kept")
+    assert gone.cancel()
+    assert kept.result(5) == "7"
+    assert llm.sent == ["kept"]
+
+
+def test_arequest_honours_its_timeout():
+    llm = _StubLLM()
+    broker = BatchBroker(llm, window=0.3)
+
+    async def ask():
+        return await asyncio.gather(broker.arequest("late", timeout=0.05), broker.arequest("kept"),
+                                    return_exceptions=True)
+
+    late, kept = asyncio.run(ask())
+    assert isinstance(late, TimeoutError)
+    assert kept == "7"
+    assert llm.sent == ["kept"]
+
+
+def test_split_answers_marks_missing_positions():
+    assert split_answers("2: 5\n1 = 4", 3) == ["4", "5", ""]
+
+
+def test_ranking_bypasses_the_broker(ai_player):
+    class _NoBroker:
+        def request(self, prompt, timeout=None):
+            raise AssertionError("ranking prompts must not be batched")
+
+    player = ai_player(1, batch=True, deadline=None)
+    player.broker = _NoBroker()
+    player.llm = _StubLLM(reply="2, 0, 1")
+    moves = ChineseCheckers(2).get_valid_moves(1)
+    candidates, _ = player.select_candidates(moves)
+
+    ranked = player._llm_rank(moves, 3)
+    assert ranked == [moves[candidates[i]] for i in (2, 0, 1)]
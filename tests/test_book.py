@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from engine.book import ENTRY_DTYPE, OpeningBook, board_key, build_book, position_key, write_book
+from engine.logic import ChineseCheckers
+from engine.records import GameRecordWriter, RecordArchive
+
+
+def _opening(first, plies=4):
+    """Moves of a 2-player game whose first move is P1's `first`-th valid move, then always the first."""
+    game = ChineseCheckers(2)
+    moves = []
+    for ply in range(plies):
+        choice = sorted(game.get_valid_moves(game.to_move))[first if ply == 0 else 0]
+        moves.append(choice)
+        game.apply_move(*choice)
+    return moves
+
+
+# (first move index, winner): P1's opening 0 played three times and won twice,
+# opening 1 twice and never won, opening 2 once
+GAMES = [(0, 1), (0, 1), (0, 2), (1, 2), (1, 2), (2, 1)]
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    for seed, (first, winner) in enumerate(GAMES):
+        writer.begin_game(["a", "b"], seed, 2)
+        for start, end in _opening(first):
+            writer.add_move(0, start, end)
+        writer.end_game(winner)
+    writer.close()
+
+    archive = RecordArchive(path)
+    table = build_book(archive, max_ply=2)
+    archive.close()
+    out = str(tmp_path / "book.hxb")
+    write_book(table, out)
+    return out, table
+
+
+def _start():
+    game = ChineseCheckers(2)
+    return game, sorted(game.get_valid_moves(1))
+
+
+def test_round_trip(book_path):
+    path, table = book_path
+    book = OpeningBook(path)
+    hashes, rows = book.columns
+    assert len(book) == len(table)
+    assert np.array_equal(hashes, table["hash"])
+    assert np.all(hashes[:-1] <= hashes[1:])
+    for name in ("player_count", "start", "end", "visits", "wins"):
+        assert np.array_equal(rows[name], table[name])
+
+    game, moves = _start()
+    assert sorted(book.lookup(position_key(game, 1), 2)) == sorted([
+        (*moves[0], 3, 2),
+        (*moves[1], 2, 0),
+        (*moves[2], 1, 1),
+    ])
+    assert board_key(game.board, 2, 1) == position_key(game, 1)
+    # Same position keyed for another player count is a different book line
+    assert book.lookup(position_key(game, 1), 3) == []
+
+
+def test_hit_returns_only_a_legal_move(book_path):
+    book = OpeningBook(book_path[0])
+    game, moves = _start()
+    key = position_key(game, 1)
+
+    assert book.choose(key, moves, 2) == moves[0]
+    # The best line is not legal here: the next best one that is
+    assert book.choose(key, moves[1:], 2) == moves[1]
+    # moves[2] was seen once, below min_visits
+    assert book.choose(key, moves[2:], 2) is None
+    assert (book.hits, book.misses) == (2, 1)
+
+
+def test_miss_returns_none(book_path):
+    book = OpeningBook(book_path[0])
+    game, moves = _start()
+    game.apply_move(*moves[-1])  # never played in the archive
+    key = position_key(game, 2)
+    assert book.lookup(key, 2) == []
+    assert book.choose(key, game.get_valid_moves(2), 2) is None
+    assert (book.hits, book.misses) == (0, 1)
+
+
+def test_empty_book(tmp_path):
+    path = str(tmp_path / "empty.hxb")
+    write_book(np.zeros(0, dtype=ENTRY_DTYPE), path)
+    book = OpeningBook(path)
+    game, moves = _start()
+    assert len(book) == 0
+    assert book.choose(position_key(game, 1), moves, 2) is None
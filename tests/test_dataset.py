@@ -0,0 +1,107 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from engine.dataset import ShardWriter, export_archive, export_selfplay, game_samples, play_selfplay
+from engine.evaluate import evaluate_game
+from engine.logic import CELLS, ChineseCheckers
+from engine.records import GameRecordWriter, RecordArchive
+
+SPECS = ["greedy", "random"]
+GAMES = 4
+MAX_TURNS = 60
+SHARD = 47  # several shards, and games straddle their boundaries
+
+
+class _Crash(Exception):
+    pass
+
+
+def _export(source, out_dir, crash_after=None, monkeypatch=None):
+    """Export `source` into out_dir; with crash_after, die in the flush after that many shards."""
+    writer = ShardWriter(str(out_dir), shard_size=SHARD)
+    if crash_after is not None:
+        real_flush = writer.flush
+        def flush():
+            if len(writer.manifest["shards"]) == crash_after:
+                raise _Crash  # buffered samples are lost, like a killed process
+            real_flush()
+        monkeypatch.setattr(writer, "flush", flush)
+    try:
+        source(writer)
+    finally:
+        if crash_after is None:
+            writer.close()
+    return writer
+
+
+def _selfplay(writer):
+    export_selfplay(SPECS, GAMES, 7, MAX_TURNS, writer, augment=False)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    for seed in range(GAMES):
+        moves, winner = play_selfplay(SPECS, seed, MAX_TURNS)
+        writer.begin_game(SPECS, seed, 2)
+        for s, e in moves:
+            writer.add_move(0, CELLS[s], CELLS[e])
+        writer.end_game(winner)
+    writer.close()
+    archive = RecordArchive(path)
+    yield archive
+    archive.close()
+
+
+def _files(out_dir):
+    return {name: open(os.path.join(out_dir, name), "rb").read() for name in sorted(os.listdir(out_dir))}
+
+
+@pytest.mark.parametrize("crash_after", [1, 3])
+@pytest.mark.parametrize("kind", ["selfplay", "archive"])
+def test_resume_after_crash_matches_full_export(kind, crash_after, tmp_path, monkeypatch, request):
+    source = _selfplay
+    if kind == "archive":
+        records = request.getfixturevalue("archive")
+        source = lambda writer: export_archive(records, writer, augment=False)
+
+    _export(source, tmp_path / "full")
+    with pytest.raises(_Crash):
+        _export(source, tmp_path / "resumed", crash_after, monkeypatch)
+    partial = json.load(open(tmp_path / "resumed" / "manifest.json"))
+    assert len(partial["shards"]) == crash_after
+    _export(source, tmp_path / "resumed")
+
+    assert _files(tmp_path / "resumed") == _files(tmp_path / "full")
+
+
+def test_rerun_skips_finished_games(tmp_path):
+    writer = _export(_selfplay, tmp_path)
+    manifest = json.load(open(tmp_path / "manifest.json"))
+    # One counter per source, not one entry per game
+    assert manifest["done"] == {"selfplay:greedy/random:7": GAMES}
+    assert manifest["partial"] is None
+
+    again = _export(_selfplay, tmp_path)
+    assert again.manifest["samples"] == writer.manifest["samples"]
+    total = sum(len(np.load(tmp_path / s["file"])["side"]) for s in manifest["shards"])
+    assert total == manifest["samples"]
+
+
+def test_shards_carry_the_batch_evaluation(tmp_path):
+    writer = _export(_selfplay, tmp_path)
+    shards = [np.load(tmp_path / s["file"]) for s in writer.manifest["shards"]]
+    evals = np.concatenate([shard["eval"] for shard in shards])
+    assert all((shard["players"] == 2).all() for shard in shards)
+
+    moves, winner = play_selfplay(SPECS, 7, MAX_TURNS)
+    for i, (cells, side, *_rest) in enumerate(game_samples(2, moves, winner, augment=False)):
+        game = ChineseCheckers(2)
+        game.board = {CELLS[c]: int(pid) for c, pid in enumerate(cells) if pid}
+        scores = evaluate_game(game)
+        other = max(score for pid, score in scores.items() if pid != side)
+        assert evals[i] == pytest.approx(scores[side] - other)
@@ -0,0 +1,92 @@
+import asyncio
+
+from engine.book import position_key
+from engine.graph import HexamindGraph
+from engine.logic import ChineseCheckers
+from engine.metrics import METRICS
+
+
+class _Reply:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {}
+
+
+class _StubLLM:
+    async def ainvoke(self, messages, timeout=None):
+        await asyncio.sleep(0.001)
+        return _Reply("0")
+
+
+class _RecordingBook:
+    """Never answers, but remembers which positions it was asked about."""
+
+    def __init__(self):
+        self.keys = []
+
+    def choose(self, key, valid_moves, player_count):
+        self.keys.append(key)
+        return None
+
+
+def _decisions():
+    return sum(v for (name, _), v in METRICS.counters.items() if name == "hexamind_move_tier_total")
+
+
+def test_speculation_counts_one_decision_per_move(ai_player, monkeypatch):
+    players = [ai_player(pid, 3, deadline=None) for pid in (1, 2, 3)]
+    for player in players:
+        player.llm = _StubLLM()
+        player.book = _RecordingBook()
+    game = ChineseCheckers(3)
+    graph = HexamindGraph(players, game=game)
+
+    # Positions each player really decides on; its book must see exactly these
+    decided = {p.player_id: [] for p in players}
+    original = HexamindGraph._aget_move
+
+    async def spy(self, player, board, valid_moves, speculative=None):
+        decided[player.player_id].append(position_key(game, player.player_id))
+        return await original(self, player, board, valid_moves, speculative)
+
+    monkeypatch.setattr(HexamindGraph, "_aget_move", spy)
+
+    async def play(rounds):
+        played = 0
+        for r in range(rounds):
+            played += len(await graph.arun_round(game.board, 0, 1 + 3 * r))
+        return played
+
+    before = _decisions()
+    played = asyncio.run(play(7))
+
+    assert played == 21
+    assert _decisions() - before == played
+    assert sum(sum(p.tier_counts.values()) for p in players) == played
+    for player in players:
+        assert player.book.keys == decided[player.player_id]
+
+
+def test_game_loop_records_ai_moves(ai_player, tmp_path):
+    from agents.players import HumanPlayer
+    from engine.records import GameRecordWriter, RecordArchive
+    from ui.game_loop import GameLoop
+
+    ai = ai_player(1, 2, deadline=None)
+    ai.llm = _StubLLM()
+    players = [ai, HumanPlayer(2)]
+    game = ChineseCheckers(2)
+    recorder = GameRecordWriter(str(tmp_path / "ui.hxr"))
+    recorder.begin_game([p.name for p in players], 0, 2)
+
+    loop = GameLoop(HexamindGraph(players, game=game), game, players, 1, recorder=recorder)
+    loop.start()
+    loop.join(10)
+    moves = [e["move"] for e in loop.drain() if e["type"] == "move"]
+    recorder.close()
+
+    record = RecordArchive(str(tmp_path / "ui.hxr"))[0]
+    assert len(moves) == len(record) == 1
+    assert record.move(0) == moves[0]
+    assert record.tier(0) == "llm"
+    assert record.moves["player"][0] == 1
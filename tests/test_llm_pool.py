@@ -0,0 +1,109 @@
+import asyncio
+
+import groq
+import httpx
+import pytest
+
+from agents.llm_pool import MAX_RATE_LIMIT_RETRIES, PooledLLM, RateLimiter, RateLimitTimeout, retry_after
+
+
+class _StatusError(Exception):
+    def __init__(self, status, retry="0.01"):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = httpx.Response(status, headers={"retry-after": retry})
+
+
+def _groq_rate_limit():
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.groq.test"))
+    return groq.RateLimitError("slow down", response=response, body=None)
+
+
+def test_retry_after_only_for_rate_limits():
+    assert retry_after(_StatusError(429, "1.5")) == 1.5
+    assert retry_after(_groq_rate_limit()) == 2.0
+    assert retry_after(_StatusError(500)) is None
+    # A message that merely mentions 429 is not a rate limit
+    assert retry_after(ValueError("move 429 is invalid")) is None
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class _FlakyClient:
+    """Fails with `errors` (one per call) before answering."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+    def invoke(self, messages, **kwargs):
+        self._next()
+        return _Chunk("ok")
+
+    async def ainvoke(self, messages, **kwargs):
+        self._next()
+        return _Chunk("ok")
+
+    def stream(self, messages, **kwargs):
+        self._next()
+        yield _Chunk("a")
+        yield _Chunk("b")
+
+    async def astream(self, messages, **kwargs):
+        self._next()
+        yield _Chunk("a")
+        yield _Chunk("b")
+
+
+def _pooled(client):
+    return PooledLLM(client, RateLimiter(60000, 10 ** 9))
+
+
+def test_rate_limited_calls_are_retried():
+    client = _FlakyClient(_StatusError(429), _StatusError(429))
+    assert _pooled(client).invoke(["hi"]).content == "ok"
+    assert client.calls == 3
+
+    client = _FlakyClient(_StatusError(429))
+    assert [c.content for c in _pooled(client).stream(["hi"])] == ["a", "b"]
+    assert client.calls == 2
+
+
+def test_async_calls_are_retried():
+    async def run():
+        client = _FlakyClient(_StatusError(429))
+        reply = await _pooled(client).ainvoke(["hi"])
+        streamed = _FlakyClient(_StatusError(429))
+        chunks = [c.content async for c in _pooled(streamed).astream(["hi"])]
+        return reply.content, client.calls, chunks, streamed.calls
+
+    assert asyncio.run(run()) == ("ok", 2, ["a", "b"], 2)
+
+
+def test_other_errors_and_exhausted_retries_raise():
+    client = _FlakyClient(_StatusError(500))
+    with pytest.raises(_StatusError):
+        _pooled(client).invoke(["hi"])
+    assert client.calls == 1
+
+    client = _FlakyClient(*[_StatusError(429)] * (MAX_RATE_LIMIT_RETRIES + 1))
+    with pytest.raises(_StatusError):
+        list(_pooled(client).stream(["hi"]))
+    assert client.calls == MAX_RATE_LIMIT_RETRIES + 1
+
+
+def test_no_slot_before_timeout_sends_nothing():
+    client = _FlakyClient()
+    llm = PooledLLM(client, RateLimiter(1, 10 ** 9))
+    llm.invoke(["hi"])
+    with pytest.raises(RateLimitTimeout):
+        llm.invoke(["hi"], timeout=0.05)
+    assert client.calls == 1
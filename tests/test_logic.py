@@ -0,0 +1,145 @@
+import random
+
+import pytest
+
+from engine.logic import (ChineseCheckers, CELLS, GOAL_OWNER, HOME_OWNER, HOME_TRIANGLES, NEIGHBORS,
+                          NUM_CELLS, TRIANGLES, goal_triangle)
+
+PLIES = 300
+
+
+def _fresh(game):
+    """Same position rebuilt from scratch, so nothing is cached."""
+    other = ChineseCheckers(game.player_count)
+    other.board = dict(game.board)
+    other.to_move = game.to_move
+    other.hash = other.compute_hash()
+    return other
+
+
+def _random_plies(game, rng, plies):
+    for _ in range(plies):
+        moves = game.get_valid_moves(game.to_move)
+        if not moves or game.check_winner():
+            break
+        start, end = rng.choice(moves)
+        yield start, end
+
+
+@pytest.mark.parametrize("player_count", [2, 3, 6])
+def test_move_cache_matches_fresh_board(player_count):
+    rng = random.Random(player_count)
+    game = ChineseCheckers(player_count)
+    for start, end in _random_plies(game, rng, PLIES):
+        # Warm every player's per-piece cache so this move has to invalidate it
+        for pid in game.players:
+            game.get_valid_moves(pid)
+        game.apply_move(start, end)
+
+        fresh = _fresh(game)
+        for pid in game.players:
+            assert sorted(game.get_valid_moves(pid)) == sorted(fresh.get_valid_moves(pid))
+            for c in game.pieces[pid]:
+                assert sorted(game.get_piece_moves(c)) == sorted(fresh.get_piece_moves(c))
+
+
+@pytest.mark.parametrize("player_count", [2, 3, 6])
+def test_make_unmake_round_trip(player_count):
+    rng = random.Random(100 + player_count)
+    game = ChineseCheckers(player_count)
+    initial = (bytes(game.cells), game.to_move, game.hash)
+    assert game.hash == game.compute_hash()
+
+    snapshots = []
+    for start, end in _random_plies(game, rng, PLIES):
+        snapshots.append((bytes(game.cells), game.to_move, game.hash))
+        assert game.make_move(start, end)
+        assert game.hash == game.compute_hash()
+
+    assert snapshots
+    while game.history:
+        game.unmake()
+        cells, to_move, h = snapshots.pop()
+        assert bytes(game.cells) == cells
+        assert game.to_move == to_move
+        assert game.hash == h == game.compute_hash()
+        assert sorted(c for pid in game.players for c in game.pieces[pid]) == \
+            [c for c in range(NUM_CELLS) if cells[c]]
+
+    assert (bytes(game.cells), game.to_move, game.hash) == initial
+
+
+def _position(goal_own, goal_opponent=0, home_own=0):
+    """2-player board: P1 with goal_own pieces in its goal, home_own still at home and
+    the rest in the middle; P2 squats on goal_opponent of P1's goal cells (its own home
+    in a 2-player game), rest in the middle."""
+    game = ChineseCheckers(2)
+    goal = goal_triangle(2, 1)
+    home = TRIANGLES[HOME_TRIANGLES[2][1]]
+    size = len(goal)
+    middle = [c for c in range(NUM_CELLS) if not HOME_OWNER[2][c] and not GOAL_OWNER[2][c]]
+    board = {}
+    for c in goal[:goal_own]:
+        board[CELLS[c]] = 1
+    for c in home[:home_own]:
+        board[CELLS[c]] = 1
+    spare = size - goal_own - home_own
+    for c in middle[:spare]:
+        board[CELLS[c]] = 1
+    for c in goal[goal_own:goal_own + goal_opponent]:
+        board[CELLS[c]] = 2
+    for c in middle[spare:spare + size - goal_opponent]:
+        board[CELLS[c]] = 2
+    game.board = board
+    return game
+
+
+def test_check_winner_goal_full_of_own_pieces():
+    game = _position(goal_own=len(goal_triangle(2, 1)))
+    assert game.check_winner() == 1
+
+
+def test_check_winner_goal_partly_filled_by_opponent():
+    size = len(goal_triangle(2, 1))
+    game = _position(goal_own=size - 2, goal_opponent=2)
+    assert game.in_goal[1] < size
+    assert game.check_winner() == 1
+
+
+def test_check_winner_not_while_a_piece_is_still_home():
+    size = len(goal_triangle(2, 1))
+    game = _position(goal_own=size - 2, goal_opponent=2, home_own=1)
+    assert game.goal_filled[1] == size
+    assert game.check_winner() == 0
+
+
+def test_check_winner_needs_an_own_piece_in_the_goal():
+    size = len(goal_triangle(2, 1))
+    game = _position(goal_own=0, goal_opponent=size)
+    assert game.check_winner() == 0
+
+
+def test_check_winner_not_before_the_goal_is_full():
+    size = len(goal_triangle(2, 1))
+    game = _position(goal_own=size - 3, goal_opponent=2)
+    assert game.check_winner() == 0
+
+
+def test_check_winner_counters_follow_moves():
+    # Last piece steps into the goal via make(); the counters kept by set_cell decide it
+    goal = goal_triangle(2, 1)
+    size = len(goal)
+    game = _position(goal_own=size - 3, goal_opponent=2)
+    hole = goal[-1]
+    board = dict(game.board)
+    start = next(n for n in NEIGHBORS[hole] if n not in goal)
+    outside = next(c for c in game.pieces[1] if c not in goal and c != start)
+    del board[CELLS[outside]]
+    board[CELLS[start]] = 1  # whatever stood there makes way
+    game.board = board
+
+    assert game.check_winner() == 0
+    game.make(start, hole)
+    assert game.check_winner() == 1
+    game.unmake()
+    assert game.check_winner() == 0
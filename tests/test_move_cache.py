@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import agents.move_cache as move_cache
+from agents.move_cache import MoveCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOVES = [((0, 0), (1, 0)), ((0, 1), (1, 1)), ((2, -1), (3, -1))]
+KEY = MoveCache.make_key("model", 1, 0xABCDEF, 1)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    # Only this module's clock: time.time itself stays real for everything else
+    monkeypatch.setattr(move_cache, "time", types.SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "moves.sqlite")
+
+
+def test_entries_expire_after_ttl(db_path, clock):
+    cache = MoveCache(db_path, ttl=60)
+    cache.put(KEY, 1, MOVES[1])
+    clock.now += 59
+    assert cache.get(KEY, MOVES) == MOVES[1]
+
+    clock.now += 2
+    assert cache.get(KEY, MOVES) is None
+    assert KEY not in cache.memory
+    # The disk copy is just as old: a fresh process must not revive it
+    other = MoveCache(db_path, ttl=60)
+    assert other.get(KEY, MOVES) is None
+    assert (cache.misses, other.misses, other.disk_hits) == (1, 1, 0)
+    cache.close()
+    other.close()
+
+
+def test_cached_move_is_revalidated(db_path):
+    cache = MoveCache(db_path)
+    cache.put(KEY, 1, MOVES[1])
+
+    # Listed at another index: found by value
+    reordered = [MOVES[2], MOVES[0], MOVES[1]]
+    assert cache.get(KEY, reordered) is reordered[2]
+    # No longer legal: a miss, counted as stale
+    assert cache.get(KEY, [MOVES[0], MOVES[2]]) is None
+    assert cache.stats()["stale"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.memory_hits == 1
+    cache.close()
+
+
+def test_shared_between_processes(db_path):
+    script = (
+        "import sys; from agents.move_cache import MoveCache; "
+        f"c = MoveCache(sys.argv[1]); c.put({KEY!r}, 2, {MOVES[2]!r}); c.close()"
+    )
+    reader = MoveCache(db_path)
+    assert reader.get(KEY, MOVES) is None
+    subprocess.run([sys.executable, "-c", script, db_path], cwd=ROOT, check=True)
+
+    assert reader.get(KEY, MOVES) == MOVES[2]
+    assert reader.get(KEY, MOVES) == MOVES[2]
+    assert (reader.disk_hits, reader.memory_hits) == (1, 1)
+    reader.close()
+
+
+def test_disk_trimmed_to_max_rows(db_path, clock):
+    cache = MoveCache(db_path, max_rows=10)
+    for i in range(256):
+        clock.now += 1
+        cache.put(f"k{i}", 0, MOVES[0])
+    keys = [row[0] for row in cache.db.execute("SELECT key FROM moves ORDER BY created")]
+    assert keys == [f"k{i}" for i in range(246, 256)]
+    cache.close()
+
+
+def test_memory_only(clock):
+    cache = MoveCache(None, capacity=2)
+    for i, move in enumerate(MOVES):
+        cache.put(f"k{i}", i, move)
+    assert cache.db is None
+    assert list(cache.memory) == ["k1", "k2"]
+    assert cache.get("k0", MOVES) is None
+    assert cache.get("k2", MOVES) == MOVES[2]
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from engine.distance import HEX_DIST
+from engine.logic import ChineseCheckers, CELL_ID, goal_triangle
+
+
+def _goal_distance(player_count, pid, pos):
+    return int(HEX_DIST[CELL_ID[pos], goal_triangle(player_count, pid)].min())
+
+
+def test_three_player_ai_ranks_toward_its_own_goal(ai_player):
+    game = ChineseCheckers(3)
+    player = ai_player(3, player_count=3)
+    moves = game.get_valid_moves(3)
+    candidates, gains = player.select_candidates(moves)
+
+    assert gains.max() > 0
+    best = moves[candidates[0]]
+    assert _goal_distance(3, 3, best[1]) < _goal_distance(3, 3, best[0])
+
+
+def test_cli_ai_players_get_the_game_player_count(offline, monkeypatch):
+    import main
+
+    answers = iter(["a", "1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    player = main.setup_player(3, 3)
+    assert player.player_count == 3
+    assert player.fallback_engine.player_count == 3
+
+
+def test_mcts_needs_a_search_budget(offline):
+    from agents.players import MCTSPlayer
+
+    with pytest.raises(ValueError):
+        MCTSPlayer(1, time_limit=None, playouts=None, book=False)
+
+
+def test_mcts_players_sharing_a_process_keep_separate_trees(offline):
+    from agents.players import MCTSPlayer
+    from engine import mcts
+
+    def play(players, plies, errors):
+        try:
+            game = ChineseCheckers(2)
+            for ply in range(plies):
+                player = players[ply % 2]
+                move = player.get_move(game.board, game.get_valid_moves(player.player_id))
+                game.apply_move(*move)
+        except Exception as e:
+            errors.append(e)
+
+    games = [[MCTSPlayer(pid, playouts=60, workers=1, seed=10 * g + pid, book=False) for pid in (1, 2)]
+             for g in range(4)]
+    errors = []
+    threads = [threading.Thread(target=play, args=(players, 8, errors)) for players in games]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+    players = [p for pair in games for p in pair]
+    roots = [mcts._WORKER_ROOTS[p._tree] for p in players]
+    assert len({id(root) for root in roots}) == len(players)
+    for p in players:
+        p.close()
+        assert p._tree not in mcts._WORKER_ROOTS
+
+
+class _FixedBook:
+    def __init__(self, move):
+        self.move = move
+
+    def choose(self, key, valid_moves, player_count):
+        return self.move if self.move in valid_moves else None
+
+
+@pytest.mark.parametrize("kind", ["mcts", "alphabeta"])
+def test_search_players_share_book_and_exclude_handling(offline, kind):
+    from agents.players import AlphaBetaPlayer, MCTSPlayer
+
+    game = ChineseCheckers(2)
+    moves = game.get_valid_moves(1)
+    if kind == "mcts":
+        player = MCTSPlayer(1, playouts=40, workers=1, seed=1, book=_FixedBook(moves[0]))
+    else:
+        player = AlphaBetaPlayer(1, time_limit=0.05, max_depth=2, verbose=False, book=_FixedBook(moves[0]))
+
+    assert player.get_move(game.board, moves) == moves[0]
+    assert player.last_tier == "book"
+
+    proposed = player.propose_moves(game.board, moves, k=3, exclude=[moves[0]])
+    assert player.last_tier is None
+    assert proposed and moves[0] not in proposed
+    assert set(proposed) <= set(moves)
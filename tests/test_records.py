@@ -0,0 +1,110 @@
+import random
+
+import numpy as np
+
+from engine.logic import ChineseCheckers
+from engine.records import HEADER, MOVE_DTYPE, GameRecordWriter, RecordArchive
+
+TIERS = ["llm", "cache", "engine", "book"]
+
+
+def _write_game(writer, seed, plies, winner=0, player_count=2):
+    """Record `plies` random moves; returns the (start, end, path, tier) played and the game."""
+    rng = random.Random(seed)
+    game = ChineseCheckers(player_count)
+    writer.begin_game([f"p{i}" for i in range(player_count)], seed, player_count)
+    played = []
+    for ply in range(plies):
+        pid = game.to_move
+        start, end = rng.choice(game.get_valid_moves(pid))
+        path = game.get_move_path(start, end)
+        tier = TIERS[ply % len(TIERS)]
+        writer.add_move(pid, start, end, path, 0.25 * ply, tier)
+        game.apply_move(start, end)
+        played.append((start, end, path, tier))
+    if winner is not None:
+        writer.end_game(winner)
+    return played, game
+
+
+def _crash(writer):
+    """Drop the writer the way a killed process would: nothing finalized."""
+    writer.f.flush()
+    writer.f.close()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    first, first_game = _write_game(writer, 1, 12, winner=2)
+    second, second_game = _write_game(writer, 2, 30, winner=0, player_count=3)
+    writer.close()
+
+    archive = RecordArchive(str(tmp_path))
+    assert len(archive) == 2
+    assert archive.total_moves() == 42
+    for record, played, game, seed in ((archive[0], first, first_game, 1), (archive[1], second, second_game, 2)):
+        assert record.seed == seed
+        assert record.player_count == game.player_count
+        assert record.specs == [f"p{i}" for i in range(game.player_count)]
+        assert len(record) == len(played)
+        for ply, (start, end, move_path, tier) in enumerate(played):
+            assert record.move(ply) == (start, end)
+            assert record.tier(ply) == tier
+            assert record.path(ply) == move_path
+        assert np.allclose(record.moves["time"], 0.25 * np.arange(len(played)))
+        assert bytes(record.position().cells) == bytes(game.cells)
+    assert (archive[0].winner, archive[1].winner) == (2, 0)
+    assert archive.key(1).startswith("games.hxr@")
+    archive.close()
+
+
+def test_reopen_drops_torn_trailing_move(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    _write_game(writer, 1, 5, winner=1)
+    played, _ = _write_game(writer, 2, 7, winner=None)
+    # Crash halfway through writing the next move record
+    writer.f.write(b"\x01" * (MOVE_DTYPE.itemsize // 2))
+    _crash(writer)
+
+    writer = GameRecordWriter(path)
+    _write_game(writer, 3, 2, winner=2)
+    writer.close()
+    archive = RecordArchive(path)
+    assert [len(record) for record in archive] == [5, 7, 2]
+    assert [record.winner for record in archive] == [1, 0, 2]
+    assert [archive[1].move(ply) for ply in range(7)] == [(s, e) for s, e, _, _ in played]
+    archive.close()
+
+
+def test_reopen_finalizes_unfinished_game(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    crashed, _ = _write_game(writer, 1, 9, winner=None)
+    _crash(writer)
+
+    # Appending after recovery must not read as more moves of the crashed game
+    writer = GameRecordWriter(path)
+    appended, _ = _write_game(writer, 2, 4, winner=2)
+    writer.close()
+
+    archive = RecordArchive(path)
+    assert len(archive) == 2
+    assert (len(archive[0]), archive[0].winner) == (len(crashed), 0)
+    assert (len(archive[1]), archive[1].winner, archive[1].seed) == (len(appended), 2, 2)
+    assert archive[1].move(0) == appended[0][:2]
+    archive.close()
+
+
+def test_reopen_drops_game_with_torn_header(tmp_path):
+    path = str(tmp_path / "games.hxr")
+    writer = GameRecordWriter(path)
+    _write_game(writer, 1, 3, winner=1)
+    writer.f.write(b"HXR1" + b"\0" * (HEADER.size // 2))
+    _crash(writer)
+
+    GameRecordWriter(path).close()
+    archive = RecordArchive(path)
+    assert [len(record) for record in archive] == [3]
+    archive.close()
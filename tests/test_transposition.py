@@ -0,0 +1,79 @@
+import pytest
+
+from engine.logic import ChineseCheckers
+from engine.search import AlphaBeta
+from engine.transposition import TranspositionTable
+
+# With 4 slots, keys 1 and 5 share slot 1
+KEY, RIVAL = 1, 5
+
+
+def test_probe_counts_hits_and_misses():
+    tt = TranspositionTable(4)
+    assert tt.probe(KEY) is None
+    tt.store(KEY, "v", depth=2)
+    assert tt.probe(KEY) == (2, "v")
+    assert tt.probe(RIVAL) is None
+    assert tt.stats() == {"hits": 1, "misses": 2, "evictions": 0, "hit_rate": 1 / 3,
+                          "entries": 1, "generation": 0}
+    tt.clear()
+    assert (tt.hits, tt.misses, len(tt)) == (0, 0, 0)
+
+
+def test_depth_preferred_within_a_generation():
+    tt = TranspositionTable(4)
+    assert tt.store(KEY, "deep", depth=5)
+    assert not tt.store(RIVAL, "shallow", depth=3)
+    assert not tt.store(KEY, "shallow", depth=4)
+    assert tt.probe(KEY) == (5, "deep")
+
+    assert tt.store(RIVAL, "as deep", depth=5)
+    assert tt.probe(RIVAL) == (5, "as deep")
+    assert tt.probe(KEY) is None
+    assert tt.evictions == 1
+
+
+def test_stale_entries_are_replaced_at_any_depth():
+    tt = TranspositionTable(4)
+    tt.store(KEY, "old", depth=9)
+    tt.new_generation()
+    # Still served until something needs the slot
+    assert tt.probe(RIVAL) is None
+    assert tt.store(RIVAL, "new", depth=1)
+    assert tt.probe(RIVAL) == (1, "new")
+    assert tt.evictions == 1
+
+
+def test_hit_refreshes_an_entry():
+    tt = TranspositionTable(4)
+    tt.store(KEY, "old", depth=9)
+    tt.new_generation()
+    assert tt.probe(KEY) == (9, "old")
+    # Used this generation: depth-preferred again
+    assert not tt.store(RIVAL, "new", depth=1)
+    assert tt.probe(KEY) == (9, "old")
+
+
+def test_lru_policy():
+    tt = TranspositionTable(2, policy="lru")
+    tt.store(1, "a")
+    tt.store(2, "b")
+    assert tt.probe(1) == (0, "a")
+    tt.store(3, "c")
+    assert tt.probe(2) is None
+    assert (tt.probe(1), tt.probe(3)) == ((0, "a"), (0, "c"))
+    assert tt.evictions == 1
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        TranspositionTable(4, policy="fifo")
+
+
+def test_each_search_starts_a_generation():
+    tt = TranspositionTable(1 << 12)
+    game = ChineseCheckers(2)
+    for turn in range(1, 4):
+        AlphaBeta(game, tt=tt).search(time_limit=None, max_depth=2)
+        assert tt.generation == turn
+    assert tt.hits > 0
@@ -2,13 +2,18 @@ import streamlit as st
 import plotly.graph_objects as go
 import time
 import sys
+import numpy as np
 import os
+import uuid
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from engine.logic import ChineseCheckers
+from engine.logic import ChineseCheckers, CELLS, CELL_ID
 from engine.graph import HexamindGraph
-from agents.players import AIPlayer, HumanPlayer, Referee
+from engine.records import GameRecordWriter
+from ui.game_loop import GameLoop
+from agents.players import AIPlayer, HumanPlayer, MCTSPlayer
+from agents.selfplay import close_players
 
 st.set_page_config(page_title="Hexamind Arena", layout="wide")
 
@@ -21,59 +26,89 @@ if "players" not in st.session_state: st.session_state.players = []
 if "turn" not in st.session_state: st.session_state.turn = 1
 if "game_active" not in st.session_state: st.session_state.game_active = False
 if "logs" not in st.session_state: st.session_state.logs = []
+if "referee" not in st.session_state: st.session_state.referee = None
 if "referee_log" not in st.session_state: st.session_state.referee_log = "System Ready."
 if "selected" not in st.session_state: st.session_state.selected = None
 if "show_moves" not in st.session_state: st.session_state.show_moves = False
+if "loop" not in st.session_state: st.session_state.loop = None
+if "view_cells" not in st.session_state: st.session_state.view_cells = None
+if "winner" not in st.session_state: st.session_state.winner = 0
+if "loop_error" not in st.session_state: st.session_state.loop_error = None
+if "recorder" not in st.session_state: st.session_state.recorder = None
+if "recording" not in st.session_state: st.session_state.recording = False
 
-def draw_board(board, current_player_id=None, selected=None, targets=None):
+def open_recorder():
+    """This session's game record file under $HEXAMIND_RECORDS (see engine/records.py), or None."""
+    record_dir = os.getenv("HEXAMIND_RECORDS")
+    if not record_dir:
+        return None
+    # One file per session: the script and game-loop threads take turns writing it
+    return GameRecordWriter(os.path.join(record_dir, f"ui-{os.getpid()}-{uuid.uuid4().hex[:8]}.hxr"))
+
+def end_record(winner=0):
+    if st.session_state.recording:
+        st.session_state.recorder.end_game(winner)
+        st.session_state.recording = False
+
+@st.cache_resource
+def board_geometry():
+    """Pixel position of every cell in engine cell order; computed once per process."""
+    q = np.array([pos[0] for pos in CELLS], dtype=float)
+    r = np.array([pos[1] for pos in CELLS], dtype=float)
+    return 1.5 * q, -1.732 * (r + q / 2.0)
+
+PALETTE = np.array([PLAYER_COLORS[pid] for pid in range(7)], dtype=object)
+
+def board_figure():
+    """Figure with the static geometry and layout, built once per session.
+
+    Moves only swap the marker color / size / text arrays on it.
+    """
+    fig = st.session_state.get("board_fig")
+    if fig is None:
+        xs, ys = board_geometry()
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=xs, y=ys,
+            mode="markers+text",
+            marker=dict(size=20, color=PLAYER_COLORS[0], line=dict(width=3, color="#ffffff"), opacity=0.95),
+            textposition="middle center",
+            textfont=dict(size=12, color="black", family="Arial Black"),
+            hoverinfo='skip'
+        ))
+        fig.update_xaxes(showgrid=False, zeroline=False, visible=False, fixedrange=True)
+        fig.update_yaxes(showgrid=False, zeroline=False, visible=False, fixedrange=True)
+        fig.update_layout(
+            showlegend=False,
+            plot_bgcolor="#0e1117",
+            paper_bgcolor="#0e1117",
+            margin=dict(l=20, r=20, t=20, b=20),
+            height=650,
+            uirevision="board"
+        )
+        st.session_state.board_fig = fig
+    return fig
+
+def draw_board(cells, current_player_id=None, selected=None, targets=None):
+    """cells: the game's per-cell owner bytearray (ChineseCheckers.cells)."""
     if targets is None: targets = []
-    xs, ys, colors, sizes, texts = [], [], [], [], []
-    
-    for (q, r), pid in board.items():
-        x = 1.5 * q
-        y = 1.732 * (r + q / 2.0)
-        xs.append(x)
-        ys.append(-y)
-        
-        color = PLAYER_COLORS.get(pid, "#2d3436")
-        text_label = ""
-        size = 20
-        
-        if selected and (q, r) == selected:
-            color = "#ffffff"
-            size = 35
-            text_label = "✓"
-        elif (q, r) in targets:
-            color = "#feca57"
-            size = 30
-            text_label = "→"
-        elif pid == current_player_id:
-            size = 24
-        
-        colors.append(color)
-        sizes.append(size)
-        texts.append(text_label)
+    pids = np.frombuffer(bytes(cells), dtype=np.uint8)
+    colors = PALETTE[pids]
+    sizes = np.where(pids == current_player_id, 24, 20)
+    texts = np.full(len(pids), "", dtype=object)
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=xs, y=ys, 
-        mode="markers+text",
-        marker=dict(size=sizes, color=colors, line=dict(width=3, color="#ffffff"), opacity=0.95),
-        text=texts, 
-        textposition="middle center", 
-        textfont=dict(size=12, color="black", family="Arial Black"),
-        hoverinfo='skip'
-    ))
-    
-    fig.update_xaxes(showgrid=False, zeroline=False, visible=False, fixedrange=True)
-    fig.update_yaxes(showgrid=False, zeroline=False, visible=False, fixedrange=True)
-    fig.update_layout(
-        showlegend=False, 
-        plot_bgcolor="#0e1117", 
-        paper_bgcolor="#0e1117", 
-        margin=dict(l=20, r=20, t=20, b=20), 
-        height=650
-    )
+    for pos in targets:
+        c = CELL_ID[pos]
+        colors[c], sizes[c], texts[c] = "#feca57", 30, "→"
+    if selected:
+        c = CELL_ID[selected]
+        colors[c], sizes[c], texts[c] = "#ffffff", 35, "✓"
+
+    fig = board_figure()
+    with fig.batch_update():
+        fig.data[0].marker.color = colors
+        fig.data[0].marker.size = sizes
+        fig.data[0].text = texts
     return fig
 
 # Sidebar
@@ -90,28 +125,48 @@ for i in range(1, mode_map[game_mode] + 1):
         p_type = st.radio(f"P{i}", ["AI", "Human"], key=f"p{i}_t", label_visibility="collapsed")
     with col_b:
         if p_type == "AI":
-            model = st.selectbox(f"Model P{i}", ["Gemini Flash", "GPT-4o", "Llama 3.3"], key=f"p{i}_m", label_visibility="collapsed")
-            pmap = {"Gemini Flash": "groq", "GPT-4o": "github_gpt", "Llama 3.3": "groq"}
+            model = st.selectbox(f"Model P{i}", ["Gemini Flash", "GPT-4o", "Llama 3.3", "MCTS (Local)"], key=f"p{i}_m", label_visibility="collapsed")
+            pmap = {"Gemini Flash": "groq", "GPT-4o": "github_gpt", "Llama 3.3": "groq", "MCTS (Local)": "mcts"}
             player_configs.append({"type": "AI", "id": i, "provider": pmap[model], "label": model})
         else:
             st.write(f"**P{i} (You)**")
             player_configs.append({"type": "Human", "id": i})
 
 if st.sidebar.button("🎬 START GAME", type="primary"):
+    if st.session_state.loop is not None:
+        st.session_state.loop.recorder = None  # its late moves belong to no record
+        st.session_state.loop.stop()
+        st.session_state.loop = None
+    # Old MCTS players own process pools; shut them down before replacing them
+    close_players(st.session_state.players)
     st.session_state.game = ChineseCheckers(player_count=mode_map[game_mode])
     st.session_state.players = []
     for conf in player_configs:
-        if conf["type"] == "AI":
+        if conf["type"] == "AI" and conf["provider"] == "mcts":
+            p = MCTSPlayer(conf["id"], player_count=mode_map[game_mode], display_name=conf['label'])
+            st.session_state.players.append(p)
+        elif conf["type"] == "AI":
             # Pass display_name to show in UI, but use "groq" as backend provider
             p = AIPlayer(
                 conf["id"], 
                 model_provider="groq",  # Always use Groq backend
-                display_name=conf['label']  # But show "Gemini Flash", "GPT-4o", etc. in UI
+                display_name=conf['label'],  # But show "Gemini Flash", "GPT-4o", etc. in UI
+                player_count=mode_map[game_mode]
             )
             st.session_state.players.append(p)
         else: 
             st.session_state.players.append(HumanPlayer(conf["id"]))
-    st.session_state.graph_engine = HexamindGraph(st.session_state.players)
+    end_record()
+    if st.session_state.recorder is None:
+        st.session_state.recorder = open_recorder()
+    if st.session_state.recorder is not None:
+        st.session_state.recorder.begin_game([p.name for p in st.session_state.players], 0,
+                                             mode_map[game_mode])
+        st.session_state.recording = True
+    st.session_state.winner = 0
+    st.session_state.loop_error = None
+    # Graph shares the game object, so turns move no board copies around
+    st.session_state.graph_engine = HexamindGraph(st.session_state.players, game=st.session_state.game)
     st.session_state.turn = 1
     st.session_state.game_active = True
     st.session_state.logs = ["🎮 Game Started!"]
@@ -119,13 +174,87 @@ if st.sidebar.button("🎬 START GAME", type="primary"):
     st.session_state.show_moves = False
     st.rerun()
 
+def apply_events(loop):
+    """Fold the loop's queued events into session state; True once it has finished."""
+    finished = False
+    for event in loop.drain():
+        kind = event["type"]
+        if kind == "move":
+            move = event["move"]
+            if move is not None:
+                # Replay the delta on the render copy; the loop still owns the game
+                view = st.session_state.view_cells
+                start, end = CELL_ID[move[0]], CELL_ID[move[1]]
+                view[end], view[start] = view[start], 0
+            st.session_state.logs.extend(event["logs"])
+            st.session_state.turn = event["turn"] + 1
+        elif kind == "referee":
+            st.session_state.referee_log = event["text"]
+        elif kind == "winner":
+            st.session_state.winner = event["player_id"]
+            end_record(event["player_id"])
+        elif kind == "error":
+            # Stops the auto-restart below until the user retries
+            st.session_state.loop_error = f"Turn {event['turn']}: {event['message']}"
+            st.session_state.logs.append(f"❌ Game loop error: {event['message']}")
+        elif kind == "done":
+            st.session_state.turn = event["turn"]
+            st.session_state.referee = loop.referee
+            st.session_state.loop = None
+            finished = True
+    return finished
+
+@st.fragment(run_every=0.25)
+def ai_turns_view():
+    """Polls the background loop; only this fragment reruns while AIs are playing."""
+    loop = st.session_state.loop
+    if loop is None or apply_events(loop):
+        st.rerun(scope="app")
+        return
+    players = st.session_state.players
+    current = players[(st.session_state.turn - 1) % len(players)]
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.markdown(f"### 🎯 Turn {st.session_state.turn}: {current.name}")
+        fig = draw_board(st.session_state.view_cells, current.player_id)
+        st.plotly_chart(fig, width='stretch', key="board")
+    with col2:
+        st.markdown("### 📊 Game Status")
+        st.info(f"🎤 {st.session_state.referee_log}")
+        st.info("🤖 AI is thinking...")
+        st.markdown("---")
+        st.markdown("### 📜 Recent Moves")
+        for log in reversed(st.session_state.logs[-5:]):
+            st.text(log)
+
 # Main game
 if st.session_state.game_active:
     game = st.session_state.game
     players = st.session_state.players
     p_idx = (st.session_state.turn - 1) % mode_map[game_mode]
     current = players[p_idx]
-    
+
+    if st.session_state.winner:
+        st.success(f"🏆 Player {st.session_state.winner} wins!")
+    elif st.session_state.loop_error:
+        st.error(f"❌ AI turn failed - {st.session_state.loop_error}")
+        if st.button("🔁 Retry AI turn"):
+            st.session_state.loop_error = None
+            st.rerun()
+    elif st.session_state.loop is None and not current.is_human:
+        # Hand the AI turns to a background thread; it stops when a human is up
+        st.session_state.view_cells = bytearray(game.cells)
+        st.session_state.loop = GameLoop(st.session_state.graph_engine, game, players,
+                                         st.session_state.turn, turbo=turbo_mode,
+                                         referee=st.session_state.referee,
+                                         recorder=st.session_state.recorder if st.session_state.recording else None)
+        st.session_state.loop.start()
+
+if st.session_state.game_active and st.session_state.loop is not None:
+    ai_turns_view()
+
+elif st.session_state.game_active:
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -140,8 +269,9 @@ if st.session_state.game_active:
                     targets.append(end)
         
         # Draw board
-        fig = draw_board(game.board, current.player_id, st.session_state.selected, targets)
-        st.plotly_chart(fig, width='stretch', key=f"board_{st.session_state.turn}")
+        fig = draw_board(game.cells, current.player_id, st.session_state.selected, targets)
+        # Stable key: the chart element is updated in place instead of remounted each turn
+        st.plotly_chart(fig, width='stretch', key="board")
     
     with col2:
         st.markdown("### 📊 Game Status")
@@ -150,7 +280,7 @@ if st.session_state.game_active:
         valid = game.get_valid_moves(current.player_id)
         st.metric("Valid Moves", len(valid))
         
-        if current.is_human:
+        if current.is_human and not st.session_state.winner:
             if not valid:
                 st.error("❌ No valid moves! Skipping turn...")
                 time.sleep(1.5)
@@ -191,8 +321,17 @@ if st.session_state.game_active:
                             with col:
                                 if st.button(f"→ {target}", key=f"dest_{target}", width='stretch'):
                                     # Execute move
+                                    if st.session_state.recording:
+                                        st.session_state.recorder.add_move(
+                                            current.player_id, st.session_state.selected, target,
+                                            game.get_move_path(st.session_state.selected, target))
                                     game.apply_move(st.session_state.selected, target)
                                     st.session_state.logs.append(f"✅ You: {st.session_state.selected} → {target}")
+                                    # Same check the GameLoop runs after every AI move
+                                    winner = game.check_winner()
+                                    if winner:
+                                        st.session_state.winner = winner
+                                        end_record(winner)
                                     st.session_state.selected = None
                                     st.session_state.show_moves = False
                                     st.session_state.turn += 1
@@ -217,28 +356,7 @@ if st.session_state.game_active:
                                     st.session_state.show_moves = True
                                     st.rerun()
         
-        else:
-            # AI Turn
-            st.info("🤖 AI is thinking...")
-            if not turbo_mode:
-                time.sleep(0.5)
-            
-            result = st.session_state.graph_engine.run_turn(game.board, p_idx, st.session_state.turn)
-            game.board = result["board"]
-            
-            if "logs" in result:
-                st.session_state.logs.extend(result["logs"])
-            
-            if st.session_state.turn % 5 == 0:
-                try:
-                    st.session_state.referee_log = Referee().commentate(current.name, "played")
-                except:
-                    pass
-            
-            st.session_state.turn += 1
-            st.session_state.selected = None
-            st.rerun()
-        
+
         # Game log
         st.markdown("---")
         st.markdown("### 📜 Recent Moves")
@@ -0,0 +1,106 @@
+import asyncio
+import queue
+import threading
+
+from agents.players import Referee
+
+
+class _Stopped(Exception):
+    pass
+
+
+class GameLoop(threading.Thread):
+    """Plays AI turns off the Streamlit script thread.
+
+    Runs from `turn` until a human is to move, someone wins, or stop() is
+    called. Turns are played a round at a time through the graph's
+    arun_round, so every LLM player's request for the round is already in
+    flight while earlier moves are applied. One event per move goes onto
+    `events`:
+
+        {"type": "move", "turn": t, "move": (start, end) or None, "logs": [...]}
+        {"type": "referee", "text": ...}
+        {"type": "winner", "player_id": pid}
+        {"type": "error", "turn": t, "message": ...}
+        {"type": "done", "turn": next_turn}
+
+    The loop owns `game` while alive; the UI renders from the move deltas
+    and only touches the game again once "done" has arrived. With a
+    `recorder` (engine.records.GameRecordWriter, game already begun) each
+    AI move is also appended to it; the caller ends the game.
+    """
+
+    def __init__(self, graph_engine, game, players, turn, turbo=True, referee=None, pause=0.5,
+                 recorder=None):
+        super().__init__(name="hexamind-game-loop", daemon=True)
+        self.graph = graph_engine
+        self.game = game
+        self.players = players
+        self.turn = turn
+        self.turbo = turbo
+        self.referee = referee
+        self.pause = pause
+        self.recorder = recorder
+        self.events = queue.Queue()
+        # Not `_stop`: threading.Thread uses that name internally (join / is_alive)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def drain(self):
+        """All events queued so far, without blocking."""
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
+
+    def run(self):
+        try:
+            asyncio.run(self._play())
+        except _Stopped:
+            pass
+        except Exception as e:
+            self.events.put({"type": "error", "turn": self.turn, "message": str(e)})
+        finally:
+            self.events.put({"type": "done", "turn": self.turn})
+
+    async def _play(self):
+        n = len(self.players)
+        while not self._stop_event.is_set():
+            winner = self.game.check_winner()
+            if winner:
+                self.events.put({"type": "winner", "player_id": winner})
+                return
+            p_idx = (self.turn - 1) % n
+            if self.players[p_idx].is_human:
+                return
+            await self.graph.arun_round(self.game.board, p_idx, self.turn, on_move=self._on_move)
+
+    async def _on_move(self, result):
+        turn = result["turn"]
+        move, recorder = result.get("last_move"), self.recorder
+        if recorder is not None and move is not None:
+            player = self.players[result["player_idx"]]
+            recorder.add_move(player.player_id, move[0], move[1],
+                              tier=getattr(player, "last_tier", None))
+        self.events.put({"type": "move", "turn": turn, "move": move, "logs": result.get("logs", [])})
+        self.turn = turn + 1
+        if turn % 5 == 0:
+            await asyncio.to_thread(self._commentate, self.players[result["player_idx"]])
+        if self._stop_event.is_set():
+            # Unwinds arun_round, which cancels the round's outstanding requests
+            raise _Stopped
+        if not self.turbo and not self.game.check_winner():
+            # Watch mode: let each move show before the next one lands
+            await asyncio.sleep(self.pause)
+
+    def _commentate(self, player):
+        try:
+            if self.referee is None:
+                self.referee = Referee()
+            self.events.put({"type": "referee", "text": self.referee.commentate(player.name, "played")})
+        except Exception:
+            pass